@@ -17,6 +17,7 @@ a = Analysis(
         'cv2.CAP_PROP_FRAME_COUNT',
         'numpy',
         'imagehash',
+        'pillow_avif',
         'PIL',
         'PyQt5',
         'cv2',
@@ -0,0 +1,184 @@
+"""
+Benchmarks for the duplicate detector.
+
+    python benchmark.py decode <folder> [--limit N]
+    python benchmark.py startup [--workers N]
+    python benchmark.py seek <folder> [--limit N] [--threshold N]
+
+Each benchmark prints its timings and, where relevant, how far the hashes of
+the optimized path drift from the original path.
+"""
+
+import argparse
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import Counter
+import duplicate_detector
+from duplicate_detector import resize_image, calculate_phash, hamming_distance, hamming_distances, probe_video
+
+
+def collect_files(folder_path, extensions, limit=None):
+    """
+    Collect up to limit files with one of the given extensions.
+    """
+    found = []
+    for root, dirs, files in os.walk(folder_path):
+        for file in sorted(files):
+            if file.lower().endswith(extensions):
+                found.append(os.path.join(root, file))
+                if limit and len(found) >= limit:
+                    return found
+    return found
+
+
+def print_distances(distances, unit='files'):
+    """
+    Print a histogram of hash distances between two paths.
+    """
+    histogram = Counter(distances)
+    print("Hash distance between the two paths:")
+    for distance in sorted(histogram):
+        print(f"  {distance:2} bits: {histogram[distance]} {unit}")
+
+
+def benchmark_decode(folder_path, limit=None):
+    """
+    Compare the full decode path of resize_image against the reduced-size grayscale decode.
+    """
+    files = collect_files(folder_path, duplicate_detector.IMAGE_EXTENSIONS, limit)
+    if not files:
+        print("No images found.")
+        return
+
+    timings = {}  # extension -> [file count, full decode seconds, fast decode seconds]
+    distances = []
+    for file_path in files:
+        extension = os.path.splitext(file_path)[1].lower()
+        timing = timings.setdefault(extension, [0, 0.0, 0.0])
+        timing[0] += 1
+
+        hashes = {}
+        for fast_decode in (False, True):
+            start = time.perf_counter()
+            hashes[fast_decode] = calculate_phash(resize_image(file_path, fast_decode=fast_decode))
+            timing[2 if fast_decode else 1] += time.perf_counter() - start
+        if hashes[False] is not None and hashes[True] is not None:
+            distances.append(hamming_distance(hashes[False], hashes[True]))
+
+    print(f"Decoded {len(files)} images (ms per image)")
+    print(f"  {'format':8} {'files':>6} {'full':>9} {'fast':>9} {'speedup':>8}")
+    for extension, (count, full_time, fast_time) in sorted(timings.items()):
+        print(f"  {extension:8} {count:6} {full_time / count * 1000:9.2f} {fast_time / count * 1000:9.2f} {full_time / fast_time:7.2f}x")
+    print_distances(distances)
+
+
+def _worker_probe(task_number):
+    """
+    Runs inside a freshly spawned worker: report which heavy modules importing the detector pulled in.
+    """
+    return {module: module in sys.modules for module in ('cv2', 'pillow_avif', 'imagehash')}
+
+
+def benchmark_startup(workers):
+    """
+    Measure how long importing the detector takes, and how long a spawn-based process pool needs
+    before every worker is ready (this is what Windows and macOS pay on every scan).
+    """
+    import_times = []
+    for _ in range(3):
+        output = subprocess.check_output(
+            [sys.executable, '-c', 'import time; start = time.perf_counter(); import duplicate_detector; print(time.perf_counter() - start)'],
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        import_times.append(float(output.decode().strip().splitlines()[-1]))
+    print(f"Importing duplicate_detector: {min(import_times) * 1000:8.1f} ms (best of 3)")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as executor:
+        loaded_modules = list(executor.map(_worker_probe, range(workers)))
+        ready_time = time.perf_counter() - start
+    print(f"Spawning {workers} workers:  {ready_time * 1000:8.1f} ms until every worker answered")
+    for module, loaded in loaded_modules[0].items():
+        print(f"  {module:12} {'loaded' if loaded else 'not loaded'} in a worker")
+
+
+def _matching_pairs(records, threshold):
+    """
+    Count the video pairs whose frame hashes are all within the threshold.
+    """
+    pairs = 0
+    for i in range(len(records)):
+        for j in range(i + 1, len(records)):
+            if (hamming_distances(records[i].hashes, records[j].hashes) <= threshold).all():
+                pairs += 1
+    return pairs
+
+
+def benchmark_seek(folder_path, limit=None, threshold=2):
+    """
+    Compare exact-frame seeking against keyframe seeking: time per video, how far the frame
+    hashes move, and whether the same duplicate pairs are still found.
+    """
+    if not duplicate_detector._keyframe_seeking_available():
+        print("Keyframe seeking needs PyAV (pip install av).")
+        return
+
+    files = collect_files(folder_path, duplicate_detector.VIDEO_EXTENSIONS, limit)
+    records = {'exact': [], 'keyframe': []}
+    timings = {'exact': 0.0, 'keyframe': 0.0}
+    distances = []
+    for file_path in files:
+        probed = {}
+        for seek_mode in ('exact', 'keyframe'):
+            start = time.perf_counter()
+            probed[seek_mode] = probe_video(file_path, preview_size=None, seek_mode=seek_mode)
+            timings[seek_mode] += time.perf_counter() - start
+        if probed['exact'] is None or probed['keyframe'] is None:
+            continue
+        for seek_mode, record in probed.items():
+            records[seek_mode].append(record)
+        distances.extend(int(distance) for distance in hamming_distances(probed['exact'].hashes, probed['keyframe'].hashes))
+
+    if not distances:
+        print("No readable videos found.")
+        return
+
+    print(f"Probed {len(records['exact'])} videos (ms per video)")
+    print(f"  exact:    {timings['exact'] / len(files) * 1000:9.1f}")
+    print(f"  keyframe: {timings['keyframe'] / len(files) * 1000:9.1f}")
+    print_distances(distances, 'frames')
+    print(f"Duplicate pairs at threshold {threshold}: exact {_matching_pairs(records['exact'], threshold)}, "
+          f"keyframe {_matching_pairs(records['keyframe'], threshold)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks for the duplicate detector.")
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    decode_parser = subparsers.add_parser("decode", help="Full versus reduced-size image decoding.")
+    decode_parser.add_argument("folder")
+    decode_parser.add_argument("--limit", type=int, default=None, help="Only use the first N images.")
+
+    startup_parser = subparsers.add_parser("startup", help="Detector import time and process pool cold start.")
+    startup_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    seek_parser = subparsers.add_parser("seek", help="Exact-frame versus keyframe video sampling.")
+    seek_parser.add_argument("folder")
+    seek_parser.add_argument("--limit", type=int, default=None, help="Only use the first N videos.")
+    seek_parser.add_argument("--threshold", type=int, default=2, help="Per-frame distance used to count duplicate pairs.")
+
+    args = parser.parse_args()
+    if args.benchmark == "decode":
+        benchmark_decode(args.folder, args.limit)
+    elif args.benchmark == "startup":
+        benchmark_startup(args.workers)
+    elif args.benchmark == "seek":
+        benchmark_seek(args.folder, args.limit, args.threshold)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+"""
+Headless command line interface for the duplicate detector.
+
+    python -m cli /photos /backup/photos --mode both --workers 32 --cache ~/.copycleaner/hashes.db > duplicates.jsonl
+
+Only the detector core is imported (no PyQt), so this runs on servers and under cron.
+Every duplicate is written as one JSON Lines record or CSV row, with the file to keep, the duplicate and the
+number of the group of duplicates it belongs to.
+Hardlinks and folders reached through another path are written as "alias" rows, they are not duplicates.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import logging_wrapper
+from duplicate_detector import (
+    find_duplicates, find_video_duplicates, find_media_duplicates, hash_to_hex, VideoRecord
+)
+from hash_cache import HashCache
+
+CSV_FIELDS = ['type', 'group', 'keep', 'duplicate', 'distance', 'keep_dimensions', 'duplicate_dimensions', 'keep_hash', 'duplicate_hash',
+              'keep_duration', 'duplicate_duration']
+
+
+def image_rows(group_number, group):
+    """
+    Turn a DuplicateGroup of ImageRecords into output rows, one for every member, the keeper is kept.
+    """
+    for keep, duplicate, distance in group.pairs():
+        yield {
+            'type': 'image',
+            'group': group_number,
+            'keep': keep.path,
+            'duplicate': duplicate.path,
+            'distance': distance,
+            'keep_dimensions': list(keep.dimensions),
+            'duplicate_dimensions': list(duplicate.dimensions),
+            'keep_hash': hash_to_hex(keep.hash),
+            'duplicate_hash': hash_to_hex(duplicate.hash),
+        }
+
+
+def video_rows(group_number, group):
+    """
+    Turn a DuplicateGroup of VideoRecords into output rows, one for every member, the keeper is kept.
+    """
+    for keep, duplicate, distance in group.pairs():
+        yield {
+            'type': 'video',
+            'group': group_number,
+            'keep': keep.path,
+            'duplicate': duplicate.path,
+            'distance': distance,
+            'keep_dimensions': list(keep.dimensions),
+            'duplicate_dimensions': list(duplicate.dimensions),
+            'keep_duration': round(keep.duration, 3),
+            'duplicate_duration': round(duplicate.duration, 3),
+        }
+
+
+def group_rows(groups):
+    """
+    Turn the DuplicateGroups of a scan into output rows, images and videos can be mixed.
+    Rows of the same group share its group number.
+    """
+    for group_number, group in enumerate(groups, 1):
+        if isinstance(group.keeper, VideoRecord):
+            yield from video_rows(group_number, group)
+        else:
+            yield from image_rows(group_number, group)
+
+
+def alias_rows(aliases):
+    """
+    Turn (first_path, alias_path) pairs into output rows. Aliases are the same file on disk (hardlinks, or a folder
+    reached through another path), so deleting one would not free any space.
+    """
+    for first_path, alias_path in aliases:
+        yield {'type': 'alias', 'keep': first_path, 'duplicate': alias_path}
+
+
+def open_results_stream(output_path):
+    """
+    Open the stream the results are written to.
+    When writing to stdout, everything else the scan prints (also from worker processes) is sent to stderr,
+    so stdout only carries results.
+    """
+    if output_path:
+        return open(output_path, 'w', newline='', encoding='utf-8')
+
+    sys.stdout.flush()
+    results_stream = os.fdopen(os.dup(sys.stdout.fileno()), 'w', newline='', encoding='utf-8')
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    return results_stream
+
+
+def write_rows(rows, results_stream, output_format):
+    """
+    Write the rows as JSON Lines or CSV.
+    """
+    if output_format == 'csv':
+        writer = csv.DictWriter(results_stream, fieldnames=CSV_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    else:
+        for row in rows:
+            results_stream.write(json.dumps(row) + '\n')
+
+
+def print_progress(label):
+    """
+    Build a progress callback that reports to stderr.
+    """
+    def progress_callback(progress):
+        print(f"\r{label}: {progress}%", end='', file=sys.stderr, flush=True)
+    return progress_callback
+
+
+def non_negative_float(value):
+    """
+    argparse type for tolerances, which can be 0 (exact) but not negative.
+    """
+    number = float(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"must be 0 or more, got {value}")
+    return number
+
+
+def positive_int(value):
+    """
+    argparse type for counts that have to be at least 1.
+    """
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be 1 or more, got {value}")
+    return number
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m cli', description='Find duplicate images and videos without the GUI.')
+    parser.add_argument('roots', nargs='+', help='Folders to scan (including subfolders).')
+    parser.add_argument('--mode', choices=['image', 'video', 'both'], default='image', help='What kind of media to scan (default: image).')
+    parser.add_argument('--include', action='append', default=None, metavar='GLOB',
+                        help='Only scan files matching this glob (name or path relative to the root). Can be repeated.')
+    parser.add_argument('--exclude', action='append', default=None, metavar='GLOB',
+                        help='Skip files and folders matching this glob (name or path relative to the root). Can be repeated.')
+    parser.add_argument('--max-depth', type=int, default=None, help='How many levels of subfolders to scan (default: all).')
+    parser.add_argument('--walk-threads', type=int, default=1, help='List this many folders at once, helps on network shares (default: 1).')
+    parser.add_argument('--threshold', type=int, default=1, help='Maximum pHash distance between duplicate images (default: 1).')
+    parser.add_argument('--video-threshold', type=int, default=2, help='Maximum pHash distance per frame between duplicate videos (default: 2).')
+    parser.add_argument('--video-samples', type=positive_int, default=None,
+                        help='Hash frames at fixed times, at most this many per video, so trimmed copies line up (default: 3 frames at 5%%, 50%% and 80%%).')
+    parser.add_argument('--video-max-shift', type=int, default=0,
+                        help='Let video frames match up to this many samples away, for trimmed copies (default: 0).')
+    parser.add_argument('--video-min-match', type=float, default=1.0,
+                        help='Fraction of video frames that must match (default: 1.0).')
+    parser.add_argument('--video-duration-tolerance', type=non_negative_float, default=0.1,
+                        help='Maximum duration difference between duplicate videos, as a fraction of the longer one (default: 0.1).')
+    parser.add_argument('--video-aspect-tolerance', type=non_negative_float, default=None,
+                        help='Maximum aspect ratio difference between duplicate videos, as a fraction (default: not checked).')
+    parser.add_argument('--exact-videos', action='store_true',
+                        help='Also skip probing byte-identical video copies (reads same-size videos completely to confirm).')
+    parser.add_argument('--video-seek', choices=['exact', 'keyframe'], default='exact',
+                        help='Hash the exact sampled frames, or the nearest keyframes (faster on long videos, needs PyAV).')
+    parser.add_argument('--index', choices=['auto', 'multi', 'bktree'], default='auto', help='Near-neighbour index used to match image hashes.')
+    parser.add_argument('--workers', type=int, default=None, help='Number of worker processes (default: one per CPU).')
+    parser.add_argument('--chunksize', type=int, default=8, help='Images hashed per worker task (default: 8).')
+    parser.add_argument('--video-chunksize', type=int, default=1, help='Videos hashed per worker task (default: 1).')
+    parser.add_argument('--cache', default=None, help='Path of the hash cache database. Unchanged files are not decoded again.')
+    parser.add_argument('--cache-max-entries', type=int, default=None, help='Evict the least recently used cache entries beyond this count.')
+    parser.add_argument('--incremental', action='store_true', help='Only report image duplicates involving new or modified files (needs --cache).')
+    parser.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl', help='Output format (default: jsonl).')
+    parser.add_argument('--output', default=None, help='Write results to this file instead of stdout.')
+    parser.add_argument('--progress', action='store_true', help='Show progress on stderr.')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.incremental and not args.cache:
+        print("--incremental needs --cache.", file=sys.stderr)
+        return 2
+
+    for root in args.roots:
+        if not os.path.isdir(root):
+            print(f"Not a folder: {root}", file=sys.stderr)
+            return 2
+
+    logging_wrapper.log_info(f"CLI scan of {len(args.roots)} folders in {args.mode} mode.")
+    results_stream = open_results_stream(args.output)
+    cache = HashCache(args.cache, args.cache_max_entries) if args.cache else None
+    rows = []
+    aliases = {}  # Ordered set of (first_path, alias_path)
+
+    def add_alias(first_path, alias_path):
+        aliases[(first_path, alias_path)] = None
+
+    walk_options = {'include': args.include, 'exclude': args.exclude, 'max_depth': args.max_depth, 'threads': args.walk_threads}
+    image_options = {
+        'hash_threshold': args.threshold, 'index_type': args.index, 'incremental': args.incremental, 'chunksize': args.chunksize
+    }
+    video_options = {
+        'hash_threshold': args.video_threshold, 'chunksize': args.video_chunksize, 'previews': False, 'seek_mode': args.video_seek,
+        'frame_samples': args.video_samples, 'max_shift': args.video_max_shift, 'min_match': args.video_min_match,
+        'duration_tolerance': args.video_duration_tolerance, 'aspect_tolerance': args.video_aspect_tolerance,
+        'exact_match': args.exact_videos
+    }
+
+    try:
+        if args.mode == 'image':
+            groups = find_duplicates(
+                args.roots, print_progress('Images') if args.progress else None, cache=cache, max_workers=args.workers,
+                alias_callback=add_alias, walk_options=walk_options, **image_options
+            )
+        elif args.mode == 'video':
+            groups = find_video_duplicates(
+                args.roots, print_progress('Videos') if args.progress else None, cache=cache, max_workers=args.workers,
+                alias_callback=add_alias, walk_options=walk_options, **video_options
+            )
+        else:
+            # Walk the roots once and hash images and videos side by side on one worker pool
+            groups = find_media_duplicates(
+                args.roots, print_progress('Media') if args.progress else None, cache=cache, max_workers=args.workers,
+                alias_callback=add_alias, walk_options=walk_options, image_options=image_options, video_options=video_options
+            )
+        rows.extend(group_rows(groups))
+        rows.extend(alias_rows(aliases))
+        if args.progress:
+            print(file=sys.stderr)
+
+        write_rows(rows, results_stream, args.format)
+    finally:
+        if cache is not None:
+            cache.close()
+        results_stream.close()
+
+    print(f"Found {len(rows) - len(aliases)} duplicates in {len(groups)} groups and {len(aliases)} aliases.", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""
+Byte-level duplicate detection.
+
+Files are grouped by size. Within a size, a hash of the first and last 64 KB
+is compared first, and the whole file is only read when those match. Files
+that are byte-identical to an earlier file do not have to be decoded at all,
+they can reuse the perceptual hash of that file.
+"""
+
+import hashlib
+import importlib
+import threading
+
+# Bytes hashed at the start and at the end of a file before reading all of it
+PARTIAL_BYTES = 64 * 1024
+
+# Block size used when reading a whole file
+READ_CHUNK_BYTES = 1024 * 1024
+
+# Optional fast hash packages, in order of preference, and how to create a hasher from each
+_HASH_BACKENDS = (('blake3', lambda module: module.blake3()), ('xxhash', lambda module: module.xxh3_128()))
+
+_hasher_factory = None
+
+
+def new_hasher():
+    """
+    Create a hasher using the fastest available backend: BLAKE3, xxHash, or BLAKE2b from the standard library.
+    """
+    global _hasher_factory
+    if _hasher_factory is None:
+        _hasher_factory = lambda: hashlib.blake2b(digest_size=16)
+        for module_name, create in _HASH_BACKENDS:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            _hasher_factory = lambda module=module, create=create: create(module)
+            break
+    return _hasher_factory()
+
+
+def partial_hash(file_path, size, partial_bytes=PARTIAL_BYTES):
+    """
+    Hash the first and last partial_bytes of a file (the whole file if it is not larger than both together).
+    """
+    hasher = new_hasher()
+    with open(file_path, 'rb') as f:
+        if size <= 2 * partial_bytes:
+            hasher.update(f.read())
+        else:
+            hasher.update(f.read(partial_bytes))
+            f.seek(size - partial_bytes)
+            hasher.update(f.read(partial_bytes))
+    return hasher.digest()
+
+
+def full_hash(file_path):
+    """
+    Hash the complete contents of a file.
+    """
+    hasher = new_hasher()
+    buffer = bytearray(READ_CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(file_path, 'rb') as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            hasher.update(view[:read])
+    return hasher.digest()
+
+
+class ExactDuplicateFilter:
+    """
+    Streaming byte-identical duplicate check.
+    Every file is compared against the earlier files of the same size only, and files are only
+    read when a same-size file exists, so files with a unique size are never opened.
+
+    add_new_size is cheap and is called from the thread that walks the files. find_copy reads files and
+    can run on several threads at once: files of different sizes are compared in parallel, files of
+    the same size one after another.
+    """
+
+    def __init__(self, partial_bytes=PARTIAL_BYTES):
+        self.partial_bytes = partial_bytes
+        self.representatives = {}  # size -> paths of the distinct files seen with that size
+        self.size_locks = {}  # size -> lock held while files of that size are compared
+        self.partial_hashes = {}
+        self.full_hashes = {}
+
+    def add(self, file_path, size):
+        """
+        Register a file. Returns the path of an earlier byte-identical file, or None if the
+        file is distinct (it then becomes the representative other copies are matched against).
+        """
+        if self.add_new_size(file_path, size):
+            return None
+        return self.find_copy(file_path, size)
+
+    def add_new_size(self, file_path, size):
+        """
+        Register a file without reading it if it is the first file of its size, and return True.
+        Returns False if there are files of the same size already, find_copy then has to compare them.
+        """
+        if size not in self.representatives:
+            self.representatives[size] = [file_path]
+            return True
+        self.size_locks.setdefault(size, threading.Lock())
+        return False
+
+    def find_copy(self, file_path, size):
+        """
+        Compare a file against the earlier files of its size (after add_new_size returned False). Returns the path of
+        an earlier byte-identical file, or None if the file is distinct (it then becomes a representative).
+        """
+        try:
+            # Reading the file itself needs no lock, only the comparison with the representatives does
+            self._partial_hash(file_path, size)
+        except OSError:
+            pass  # Reported below, when the comparison reads it again
+
+        with self.size_locks[size]:
+            representatives = self.representatives[size]
+            try:
+                for representative in representatives:
+                    if self._partial_hash(representative, size) != self._partial_hash(file_path, size):
+                        continue
+                    if self._full_hash(representative, size) == self._full_hash(file_path, size):
+                        # Only representatives are compared against, so the hashes of the copy are not needed anymore
+                        self.partial_hashes.pop(file_path, None)
+                        self.full_hashes.pop(file_path, None)
+                        return representative
+            except OSError as e:
+                print(f"Could not compare {file_path} byte by byte: {e}")
+
+            representatives.append(file_path)
+            return None
+
+    def add_distinct(self, file_path, size):
+        """
+        Register a file as a representative without reading it, for files that are handled anyway (e.g. cached ones).
+        Later copies of it are still recognised.
+        """
+        if not self.add_new_size(file_path, size):
+            # Not locked, so the walk never waits for a comparison. list.append is atomic, and a comparison
+            # that is running picks the file up or not, either way it is still matched by its hash
+            self.representatives[size].append(file_path)
+
+    def _partial_hash(self, file_path, size):
+        digest = self.partial_hashes.get(file_path)
+        if digest is None:
+            digest = self.partial_hashes[file_path] = partial_hash(file_path, size, self.partial_bytes)
+        return digest
+
+    def _full_hash(self, file_path, size):
+        if size <= 2 * self.partial_bytes:
+            return self._partial_hash(file_path, size)  # The partial hash already covered the whole file
+        digest = self.full_hashes.get(file_path)
+        if digest is None:
+            digest = self.full_hashes[file_path] = full_hash(file_path)
+        return digest
@@ -1,188 +1,527 @@
 import os
-from PIL import Image
-import pillow_avif
-from imagehash import phash, hex_to_hash
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from cv2 import VideoCapture, CAP_PROP_FRAME_COUNT, CAP_PROP_POS_FRAMES, cvtColor, COLOR_BGR2RGB, CAP_PROP_FRAME_WIDTH, CAP_PROP_FRAME_HEIGHT, CAP_PROP_FPS
+from contextlib import contextmanager
+from array import array
+from collections import namedtuple
+import importlib
+import importlib.util
+import math
+from PIL import Image, UnidentifiedImageError
+import numpy
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
 import logging_wrapper
+from content_hash import ExactDuplicateFilter
+from duplicate_groups import DisjointSet, keep_highest_quality
+from hash_cache import file_key
+from media_scanner import scan_media, physical_file_id
+from hash_index import create_hash_index, hamming_distance, hamming_distances, hash_to_hex, image_hash_to_int, HASH_BITS
 
 # Setup the logger
 logging_wrapper.setup_logger()
 
-def resize_image(file_path, target_size=(500, 500), min_size=(256, 256)):
+# File extensions that are treated as images
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.heif', '.heic', '.tiff', '.raw', '.avif', '.jxl')
+
+# Pillow plugins that are only imported once a file with a matching extension shows up.
+# Keeping them (and OpenCV / imagehash) out of the module import keeps worker start-up cheap.
+IMAGE_FORMAT_PLUGINS = {'.avif': 'pillow_avif'}
+
+# Everything the scan learns about an image, gathered from a single open of the file.
+# resolution is width * height, dimensions is (width, height), format is the PIL format name.
+ImageRecord = namedtuple('ImageRecord', ['path', 'hash', 'resolution', 'dimensions', 'file_size', 'format'])
+
+def _open_image(file_path):
     """
-    Resize an image to the target size if it's larger than min_size, otherwise keep original size.
+    Open an image with PIL, loading the format plugin its extension needs first.
     """
+    plugin = IMAGE_FORMAT_PLUGINS.get(os.path.splitext(file_path)[1].lower())
+    if plugin is not None:
+        importlib.import_module(plugin)
     try:
-        with Image.open(file_path) as img:
-            original_width, original_height = img.size
-            
-            # Determine if resizing is necessary
-            if original_width > min_size[0] and original_height > min_size[1]:
-                # Calculate the new size, maintaining aspect ratio
-                img.thumbnail(target_size, Image.Resampling.LANCZOS)
-                logging_wrapper.log_info(f"Image was resized: {img}")
-            else:
-                print(f"Image {file_path} is smaller than minimum size, skipping resizing.")
+        return Image.open(file_path)
+    except UnidentifiedImageError:
+        # The extension may not match the contents, so try again with every plugin loaded
+        for plugin in set(IMAGE_FORMAT_PLUGINS.values()):
+            importlib.import_module(plugin)
+        return Image.open(file_path)
+
+def _reduce_factor(size, target_size):
+    """
+    Largest power-of-two reduction that keeps both sides at or above the target size.
+    """
+    factor = 0
+    while (size[0] >> (factor + 1)) >= target_size[0] and (size[1] >> (factor + 1)) >= target_size[1]:
+        factor += 1
+    return factor
+
+def _resize_opened_image(img, file_path, target_size, min_size, fast_decode):
+    """
+    Resize an already opened (but not yet loaded) image, see resize_image.
+    """
+    original_width, original_height = img.size
+
+    # Determine if resizing is necessary
+    if original_width > min_size[0] and original_height > min_size[1]:
+        if fast_decode:
+            # Let the decoder do the downscaling before any pixels are produced
+            if img.format == 'JPEG':
+                img.draft('L', target_size)
+            elif img.format == 'JPEG2000':
+                img.reduce = _reduce_factor(img.size, target_size)
+            if img.mode != 'L':
+                img = img.convert('L')  # Resample one channel instead of three
 
-            # Ensure the image is still valid after resizing
-            if img is None:
-                logging_wrapper.log_error(f"Image became None after resizing.")
-                raise ValueError("Image became None after resizing.")
+        # Calculate the new size, maintaining aspect ratio
+        img.thumbnail(target_size, Image.Resampling.LANCZOS)
+        logging_wrapper.log_info(f"Image was resized: {img}")
+    else:
+        print(f"Image {file_path} is smaller than minimum size, skipping resizing.")
+
+    # Ensure the image is still valid after resizing
+    if img is None:
+        logging_wrapper.log_error(f"Image became None after resizing.")
+        raise ValueError("Image became None after resizing.")
+
+    return img.copy()  # Return a copy of the image to avoid 'NoneType' issues
 
-            return img.copy()  # Return a copy of the image to avoid 'NoneType' issues
+def resize_image(file_path, target_size=(500, 500), min_size=(256, 256), fast_decode=True):
+    """
+    Resize an image to the target size if it's larger than min_size, otherwise keep original size.
+    With fast_decode the image is decoded straight to grayscale at a reduced size where the format
+    allows it (DCT scaling for JPEG, resolution levels for JPEG 2000), since pHash only needs a small "L" image.
+    """
+    try:
+        with _open_image(file_path) as img:
+            return _resize_opened_image(img, file_path, target_size, min_size, fast_decode)
     except Exception as e:
         print(f"Error resizing image {file_path}: {e}")
-        logging_wrapper.log_error(f"Unable to resize the image: {img}")
+        logging_wrapper.log_error(f"Unable to resize the image {file_path}: {e}")
         return None
 
 def calculate_phash(image):
     """
-    Calculate the perceptual hash (pHash) of an image.
+    Calculate the perceptual hash (pHash) of an image as a 64-bit integer.
     """
     logging_wrapper.log_info(f'Trying to calculate P-Hash...')
     try:
+        from imagehash import phash  # Imported on first use, see IMAGE_FORMAT_PLUGINS
         image_phash = phash(image)
-        return str(image_phash)
+        return image_hash_to_int(image_phash)
     except Exception as e:
         logging_wrapper.log_error(f'Failed to calculate the PHash: {e}')
 
-def hamming_distance(hash1, hash2):
-    """
-    Calculate the Hamming distance between two hexadecimal strings.
-    """
-    # Convert hex strings to binary representations
-    bin1 = bin(int(hash1, 16))[2:].zfill(64)
-    bin2 = bin(int(hash2, 16))[2:].zfill(64)
-
-    # Compute Hamming distance
-    return sum(c1 != c2 for c1, c2 in zip(bin1, bin2))
-
 def get_image_resolution(file_path):
     """
     Get the resolution (width x height) of an image.
     """
     logging_wrapper.log_info(f'Trying to calculate image resolution...')
-    with Image.open(file_path) as img:
+    with _open_image(file_path) as img:
         width, height = img.size
         return width * height, (width, height)
 
-def process_image(file_path, target_size=(500, 500), min_size=(256, 256)):
+def process_image(file_path, target_size=(500, 500), min_size=(256, 256), fast_decode=True):
     """
-    Resize the image, calculate its pHash, and return the hash and resolution.
+    Open the image once, resize it, calculate its pHash and return an ImageRecord.
     """
     try:
-        resized_image = resize_image(file_path, target_size, min_size)
+        file_size = os.path.getsize(file_path)
+        with _open_image(file_path) as img:
+            # Read everything we need before resizing, the decoder may change size and mode
+            original_dimensions = img.size
+            image_format = img.format
+            resized_image = _resize_opened_image(img, file_path, target_size, min_size, fast_decode)
+
         file_hash = calculate_phash(resized_image)
-        resolution, original_dimensions = get_image_resolution(file_path)
+        if file_hash is None:
+            raise ValueError("Could not calculate the P-Hash.")
+
         logging_wrapper.log_info(f'Processed an image: {resized_image}')
-        return file_path, file_hash, resolution, original_dimensions
+        resolution = original_dimensions[0] * original_dimensions[1]
+        return ImageRecord(file_path, file_hash, resolution, original_dimensions, file_size, image_format)
     except Exception as e:
         print(f"Skipping {file_path}: {e}")
         logging_wrapper.log_error(f"Error in processing image: {e}")
         return None
 
-def find_duplicates(folder_path, progress_callback=None, target_size=(500, 500), min_size=(256, 256), hash_threshold=1):
+def _run_batch(task, file_paths, task_args):
     """
-    Find duplicate images in a given folder, ignoring resolution differences.
-    Returns a list of tuples, where each tuple contains the paths of duplicate images and their pHashes.
+    Run a task for a batch of files inside one worker, so a single pickled round trip covers many files.
     """
-    files_hash = {}
-    duplicates = []
-    processed_files = set()  # Track files that are already marked for deletion or processed
+    return [(file_path, task(file_path, *task_args)) for file_path in file_paths]
 
-    if not folder_path:
-        return duplicates
-
-    #Valid files
-    valid_extensions = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.heif', '.heic', '.tiff', '.raw', '.avif', '.jxl')
-
-    # Collect all file paths
-    all_files = []
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith(valid_extensions):
-                file_path = os.path.join(root, file)
-                all_files.append(file_path)
-
-    total_files = len(all_files)
-    logging_wrapper.log_info(f'Found {total_files} files that need to be checked for duplicates.')
-    processed_count = 0
-
-    # Use a ProcessPoolExecutor to process images in parallel
-    with ProcessPoolExecutor() as executor:
-        future_to_file = {executor.submit(process_image, file_path, target_size, min_size): file_path for file_path in all_files}
-
-        results = []
-        for future in as_completed(future_to_file):
-            result = future.result()
-            if result is None:
-                continue
-            results.append(result)
+@contextmanager
+def _use_executor(executor=None, max_workers=None):
+    """
+    Reuse the given executor, or create a process pool for the duration of one scan.
+    """
+    if executor is not None:
+        yield executor
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as own_executor:
+            yield own_executor
 
-            processed_count += 1
-            logging_wrapper.log_info(f"Processed one image...")
-            if progress_callback:
-                progress_callback(int((processed_count / total_files) * 100))
+def create_executor(max_workers=None):
+    """
+    Create a process pool that can be shared between image and video scans (pass it as executor=...).
+    """
+    return ProcessPoolExecutor(max_workers=max_workers)
+
+class _MediaScan:
+    """
+    Everything one scan (images or videos) keeps track of while its files are walked and hashed:
+    aliases, cache hits, byte-identical copies and the records collected so far.
+    Subclasses define the worker task, how records are cached and how they are matched.
+    """
+    kind = None
+
+    def __init__(self, cache, cache_params, exact_match, alias_callback, chunksize, max_pending):
+        self.cache = cache
+        self.cache_params = cache_params
+        self.alias_callback = alias_callback
+        self.chunksize = chunksize
+        self.max_pending = max_pending if max_pending is not None else (os.cpu_count() or 1) * 2
+        self.task = None
+        self.task_args = ()
+
+        self.results = []  # Records in the order they arrived
+        self.new_files = set()  # Files that were added or modified since they were cached
+        self.state = {'found': 0, 'processed': 0, 'cached': 0, 'exact_copies': 0, 'aliases': 0}
+        self.seen_files = {}  # (st_dev, st_ino) -> first path the file was found under
+        self.file_keys = {}  # Cache keys of the files that are being hashed
+
+        # Byte-identical copies are not decoded, they reuse the record of the first file with the same contents
+        self.exact_filter = ExactDuplicateFilter() if exact_match else None
+        self.representative_records = {}  # Representative path -> its record (None if it could not be hashed)
+        self.waiting_copies = {}  # Representative path -> copies that arrived before its record
+
+    def record_from_cache(self, file_path, key, cached):
+        raise NotImplementedError
+
+    def store_in_cache(self, record, key):
+        raise NotImplementedError
+
+    def add_result(self, record):
+        self.results.append(record)
+        self.state['processed'] += 1
+
+    def add_processed(self, record):
+        self.new_files.add(record.path)
+        key = self.file_keys.pop(record.path, None)
+        if self.cache is not None:
+            self.store_in_cache(record, key)
+        self.add_result(record)
+
+    def add_exact_copy(self, representative, file_path):
+        self.state['exact_copies'] += 1
+        if representative not in self.representative_records:
+            self.waiting_copies.setdefault(representative, []).append(file_path)
+        elif self.representative_records[representative] is not None:
+            self.add_processed(self.representative_records[representative]._replace(path=file_path))
+        else:
+            self.state['processed'] += 1  # Same bytes as a file that could not be read
+
+    def accept(self, media_file):
+        """
+        Handle a file found by the walk. Returns its path if it needs to be hashed (or first compared byte by byte),
+        or None if it is an alias or was taken from the cache.
+        """
+        file_path, kind, stat_result = media_file
 
-    # Sort results by resolution (highest to lowest)
-    results.sort(key=lambda x: (-x[2], len(os.path.basename(x[0])), os.path.basename(x[0])))
+        # Hardlinks (and other aliases) of a file that was already seen are the same file, not duplicates
+        file_id = physical_file_id(stat_result)
+        if file_id is not None:
+            first_path = self.seen_files.setdefault(file_id, file_path)
+            if first_path != file_path:
+                self.state['aliases'] += 1
+                if self.alias_callback:
+                    self.alias_callback(first_path, file_path)
+                return None
 
-    # Compare each image against the highest resolution image in its duplicate set
-    for i in range(len(results)):
-        file_path1, file_hash1, resolution1, original_dimensions1 = results[i]
-        
-        if file_path1 in processed_files:
-            continue  # Skip already processed or deleted files
+        self.state['found'] += 1
+        if self.cache is not None:
+            key = file_key(file_path, stat_result)
+            cached = self.cache.get(file_path, key, self.kind, self.cache_params)
+            if cached is not None:
+                record = self.record_from_cache(file_path, key, cached)
+                if self.exact_filter is not None:
+                    self.exact_filter.add_distinct(file_path, stat_result.st_size)
+                    self.representative_records[file_path] = record
+                self.state['cached'] += 1
+                self.add_result(record)
+                return None
+            self.file_keys[file_path] = key
+        return file_path
 
-        # Use this file as the base for comparison in the current set
-        best_image = (file_path1, file_hash1, resolution1, original_dimensions1)
-        best_path, best_hash, best_resolution, best_dimensions = best_image
+    def add_task_result(self, file_path, result):
+        """
+        Handle the record a worker produced for a file (None if the file could not be read).
+        """
+        if self.exact_filter is not None:
+            self.representative_records[file_path] = result
+        copies = self.waiting_copies.pop(file_path, ())
+        if result is None:
+            self.state['processed'] += 1 + len(copies)
+            for copy_path in copies:
+                self.file_keys.pop(copy_path, None)
+            return
+
+        self.add_processed(result)
+        for copy_path in copies:
+            self.add_processed(result._replace(path=copy_path))
+
+    def walk_done(self):
+        logging_wrapper.log_info(
+            f"Found {self.state['found']} {self.kind}s, {self.state['cached']} were taken from the hash cache, "
+            f"{self.state['exact_copies']} are byte-identical copies, "
+            f"{self.state['aliases']} were skipped as hardlinks of files already found."
+        )
+
+    def finish(self):
+        if self.cache is not None:
+            self.cache.commit()
+
+# Threads comparing same-size files byte by byte, and how many comparisons can wait before the walk pauses
+COPY_CHECK_THREADS = 4
+MAX_PENDING_COPY_CHECKS = 64
 
-        for j in range(i + 1, len(results)):
-            file_path2, file_hash2, resolution2, original_dimensions2 = results[j]
+def _run_scans(executor, scans, media_files, progress_callback=None):
+    """
+    Feed the walked media files to the scan for their kind, and hash them on one executor while the walk goes on.
+    Each scan sends chunksize files per worker task and keeps at most max_pending tasks in flight, so one media
+    type can not take over the pool. Files with the same size as an earlier file are compared byte by byte on a
+    few threads first, next to the workers, and only sent to them when they are not a copy.
+    Progress is reported over all scans once the walk is done.
+    """
+    scans_by_kind = {scan.kind: scan for scan in scans}
+    batches = {scan.kind: [] for scan in scans}  # Batch that is being filled
+    ready_batches = {scan.kind: [] for scan in scans}  # Full batches waiting for a free slot
+    in_flight = {scan.kind: 0 for scan in scans}
+    pending = {}  # Future -> scan
+    copy_checks = {}  # Future of a byte by byte comparison -> (scan, file path)
+    walk_state = {'done': False}
+    copy_checker = ThreadPoolExecutor(max_workers=COPY_CHECK_THREADS) if any(scan.exact_filter for scan in scans) else None
 
-            if file_path2 in processed_files:
-                continue  # Skip already processed or deleted files
+    def submit_ready(scan):
+        while ready_batches[scan.kind] and in_flight[scan.kind] < scan.max_pending:
+            batch = ready_batches[scan.kind].pop(0)
+            pending[executor.submit(_run_batch, scan.task, batch, scan.task_args)] = scan
+            in_flight[scan.kind] += 1
 
-            # Calculate the Hamming distance between the hashes
-            distance = hamming_distance(best_hash, file_hash2)
+    def add_to_batch(scan, file_path):
+        batches[scan.kind].append(file_path)
+        # Once the walk is done no more files are coming, so files that were compared late go out right away
+        if len(batches[scan.kind]) >= scan.chunksize or walk_state['done']:
+            ready_batches[scan.kind].append(batches[scan.kind])
+            batches[scan.kind] = []
+            submit_ready(scan)
 
-            if distance <= hash_threshold:  # Check if the hashes are within the threshold
-                if resolution2 < best_resolution:
-                    # The second image is a duplicate and of lower resolution
-                    duplicates.append((file_path2, best_path, file_hash2, best_hash))
-                    processed_files.add(file_path2)  # Mark this image as processed
+    def collect_finished():
+        done, not_done = wait(set(pending) | set(copy_checks), return_when=FIRST_COMPLETED)
+        for future in done:
+            if future in copy_checks:
+                scan, file_path = copy_checks.pop(future)
+                representative = future.result()
+                if representative is None:
+                    add_to_batch(scan, file_path)
                 else:
-                    # If the new image is of higher resolution or equal but different, update best_image
-                    if resolution2 > best_resolution:
-                        # If resolution2 is better, update the best image
-                        processed_files.add(best_path)  # The old best is now considered processed
-                        best_image = (file_path2, file_hash2, resolution2, original_dimensions2)
-                        best_path, best_hash, best_resolution, best_dimensions = best_image
-                    # If they are equal in resolution and one should be kept over the other
-                    duplicates.append((best_path, file_path2, best_hash, file_hash2))
-                    processed_files.add(file_path2)
+                    scan.add_exact_copy(representative, file_path)
+                continue
+
+            scan = pending.pop(future)
+            in_flight[scan.kind] -= 1
+            for file_path, result in future.result():
+                scan.add_task_result(file_path, result)
+            submit_ready(scan)
+
+        # The total is only known once the walk is done, so report progress from then on
+        if progress_callback and walk_state['done']:
+            found = sum(scan.state['found'] for scan in scans)
+            processed = sum(scan.state['processed'] for scan in scans)
+            progress_callback(int(processed / found * 100) if found else 100)
+
+    def backlogged():
+        return len(copy_checks) >= MAX_PENDING_COPY_CHECKS or any(
+            len(ready_batches[scan.kind]) >= scan.max_pending for scan in scans
+        )
+
+    try:
+        for media_file in media_files:
+            scan = scans_by_kind.get(media_file.kind)
+            if scan is None:
+                continue
+            file_path = scan.accept(media_file)
+            if file_path is None:
+                continue
+
+            size = media_file.stat.st_size
+            if scan.exact_filter is not None and not scan.exact_filter.add_new_size(file_path, size):
+                # Another file has the same size, compare them on the copy check threads while the walk goes on
+                copy_checks[copy_checker.submit(scan.exact_filter.find_copy, file_path, size)] = (scan, file_path)
+            else:
+                add_to_batch(scan, file_path)
+
+            # Wait for workers to free up before pulling more work from the walker
+            while backlogged():
+                collect_finished()
+
+        walk_state['done'] = True
+        for scan in scans:
+            if batches[scan.kind]:
+                ready_batches[scan.kind].append(batches[scan.kind])
+                batches[scan.kind] = []
+            submit_ready(scan)
+        while pending or copy_checks:
+            collect_finished()
+    finally:
+        if copy_checker is not None:
+            copy_checker.shutdown(cancel_futures=True)
+
+    for scan in scans:
+        scan.walk_done()
+        scan.finish()
+
+class _ImageScan(_MediaScan):
+    """
+    Image scan: pHash every image and group them with a near-neighbour index.
+    """
+    kind = 'image'
 
-        # Mark the current best image as processed after comparing with all others
-        processed_files.add(best_path)
+    def __init__(self, cache=None, alias_callback=None, target_size=(500, 500), min_size=(256, 256), hash_threshold=1, index_type='auto',
+                 incremental=False, fast_decode=True, exact_match=True, chunksize=8, max_pending=None, keeper_policy=None):
+        if incremental and cache is None:
+            raise ValueError("An incremental scan needs a hash cache to know which files are unchanged.")
 
-    # Debugging: Check the structure of the duplicates list
-    for i, duplicate in enumerate(duplicates):
-        if len(duplicate) != 4:
-            print(f"Warning: Duplicate tuple at index {i} does not have 4 elements: {duplicate}")
+        cache_params = f"phash:{target_size}:{min_size}:{'fast' if fast_decode else 'full'}"
+        super().__init__(cache, cache_params, exact_match, alias_callback, chunksize, max_pending)
+        self.task = process_image
+        self.task_args = (target_size, min_size, fast_decode)
+        self.hash_threshold = hash_threshold
+        self.incremental = incremental
+        self.keeper_policy = keeper_policy or keep_highest_quality
 
-    return duplicates
+        # Results go into the index as soon as they arrive, positions refer to the results list
+        self.hash_index = create_hash_index(hash_threshold, index_type)
+
+    def record_from_cache(self, file_path, key, cached):
+        file_hash, signature, original_dimensions, metadata = cached
+        return ImageRecord(
+            file_path, file_hash, original_dimensions[0] * original_dimensions[1], original_dimensions,
+            key[0], (metadata or {}).get('format')
+        )
+
+    def store_in_cache(self, record, key):
+        self.cache.put(
+            record.path, key, 'image', self.cache_params,
+            hash_value=record.hash, dimensions=record.dimensions, metadata={'format': record.format}
+        )
+
+    def add_result(self, record):
+        self.hash_index.add(record.hash, len(self.results))
+        super().add_result(record)
+
+    def add_task_result(self, file_path, result):
+        if result is not None:
+            logging_wrapper.log_info(f"Processed one image...")
+        super().add_task_result(file_path, result)
+
+    def match(self):
+        """
+        Group the collected images. Returns a list of DuplicateGroups, see find_duplicates.
+        """
+        results = self.results
+        hash_index = self.hash_index
+
+        # Sort results by the keeper policy, rank maps an index position to its place in that order
+        order = sorted(range(len(results)), key=lambda position: self.keeper_policy(results[position]))
+        rank = array('q', [0]) * len(results)
+        for place, position in enumerate(order):
+            rank[position] = place
+        results = [results[position] for position in order]
+
+        if self.incremental:
+            # Unchanged files were grouped on an earlier scan, only the new ones need to be matched
+            positions_to_check = [position for position, result in enumerate(results) if result.path in self.new_files]
+            logging_wrapper.log_info(f'Incremental scan: matching {len(positions_to_check)} new or modified images.')
+        else:
+            positions_to_check = range(len(results))
+
+        # Join every image with its neighbours in the index. Pairs are merged as they come out of the index
+        # and not kept, so memory only grows with the number of images. Images with the same hash (copies,
+        # blank images) are joined with the first of them, and only that one queries the index, so a cluster
+        # of identical hashes costs one query instead of one per image
+        matches = DisjointSet(len(results))
+        first_position_by_hash = {}
+        for i in positions_to_check:
+            first_position = first_position_by_hash.setdefault(results[i].hash, i)
+            if first_position != i:
+                matches.union(i, first_position)
+                continue
+            for position, distance in hash_index.query(results[i].hash, self.hash_threshold):
+                matches.union(i, rank[position])
+
+        return matches.groups(results, lambda keeper, member: hamming_distance(keeper.hash, member.hash))
+
+def find_duplicates(folder_path, progress_callback=None, target_size=(500, 500), min_size=(256, 256), hash_threshold=1, index_type='auto', cache=None, incremental=False, fast_decode=True, max_workers=None, chunksize=8, executor=None,
+                    exact_match=True, alias_callback=None, walk_options=None, media_files=None, keeper_policy=None):
+    """
+    Find duplicate images in a given folder (or list of folders), ignoring resolution differences.
+    Returns a list of DuplicateGroups of ImageRecords, one for every set of duplicates that was found. Matches are
+    transitive, so images connected through a chain of near matches form one group. Distances are pHash distances
+    to the keeper.
+    keeper_policy picks the keeper of each group, see duplicate_groups.keep_highest_quality (the default).
+    index_type selects the near-neighbour index used for matching ('auto', 'multi' or 'bktree').
+    cache is an optional HashCache; unchanged files are read from it instead of being decoded again.
+    With incremental=True only added or modified files are matched against the index, so only
+    groups involving at least one of those files are returned. This needs a cache.
+    fast_decode enables the reduced-size grayscale decode in resize_image.
+    max_workers sizes the process pool, chunksize is the number of images hashed per worker task,
+    and executor lets several scans share one pool (max_workers is ignored then).
+    exact_match compares same-size files byte by byte first, so byte-identical copies are hashed only once.
+    Every physical file is scanned once: hardlinks and folders reached through another path are not reported as
+    duplicates (deleting them would free nothing), alias_callback(first_path, alias_path) is called for them instead.
+    walk_options are passed on to media_scanner.scan_media (include, exclude, max_depth, threads).
+    media_files can be given instead of walking folder_path, e.g. from a scan_media walk shared with the video scan;
+    only the MediaFiles of kind 'image' are used.
+    """
+    if not folder_path and media_files is None:
+        return []
+
+    scan = _ImageScan(
+        cache, alias_callback, target_size, min_size, hash_threshold, index_type,
+        incremental, fast_decode, exact_match, chunksize, keeper_policy=keeper_policy
+    )
+    if media_files is None:
+        media_files = scan_media(folder_path, {'image': IMAGE_EXTENSIONS}, alias_callback=alias_callback, **(walk_options or {}))
+
+    # Use a process pool to process images in parallel while the folder is still being walked
+    with _use_executor(executor, max_workers) as pool:
+        _run_scans(pool, [scan], media_files, progress_callback)
+
+    return scan.match()
 
 
 ## VIDEO
 
+# File extensions that are treated as videos
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.mpeg', '.av1', '.m4s', '.mp4v', '.mpv')
+
+# Positions (as a fraction of the video length) of the frames that get hashed
+DEFAULT_FRAME_PERCENTAGES = (0.05, 0.5, 0.8)
+
+# Bounding box of the preview frames shown in the review window
+VIDEO_PREVIEW_SIZE = (370, 500)
+
+# Everything the scan learns about a video, gathered from a single VideoCapture session.
+# hashes holds the frame hashes as a uint64 array, resolution is width * height, duration is in seconds.
+# preview is the middle frame as JPEG bytes scaled to VIDEO_PREVIEW_SIZE, or None when it was not requested.
+VideoRecord = namedtuple('VideoRecord', ['path', 'hashes', 'resolution', 'dimensions', 'file_size', 'fps', 'frame_count', 'duration', 'preview'])
+
 def get_frame_count(video_path):
     """
     Get the total number of frames in a video.
     """
-    cap = VideoCapture(video_path)
-    total_frames = int(cap.get(CAP_PROP_FRAME_COUNT))
+    import cv2  # OpenCV is imported on first use, image-only scans never load it
+    cap = cv2.VideoCapture(video_path)
+    total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
     cap.release()
     return total_frames
 
@@ -190,131 +529,497 @@ def extract_frame(video_path, frame_number):
     """
     Extract a specific frame from a video file.
     """
-    cap = VideoCapture(video_path)
-    cap.set(CAP_PROP_POS_FRAMES, frame_number)  # Set to the specific frame
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    cap.set(cv2.CAP_PROP_POS_FRAMES, frame_number)  # Set to the specific frame
     ret, frame = cap.read()
     cap.release()
 
     if ret:
-        return Image.fromarray(cvtColor(frame, COLOR_BGR2RGB))
+        return Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
     else:
         return None
 
-def calculate_dynamic_phash_for_frames(video_path, percentages=[0.05, 0.5, 0.8]):
+def _encode_preview(frame, preview_size):
+    """
+    Scale a BGR frame down to fit preview_size and encode it as JPEG bytes.
+    """
+    import cv2
+    height, width = frame.shape[:2]
+    scale = min(preview_size[0] / width, preview_size[1] / height, 1)
+    if scale < 1:
+        frame = cv2.resize(frame, (max(1, int(width * scale)), max(1, int(height * scale))), interpolation=cv2.INTER_AREA)
+    ret, encoded = cv2.imencode('.jpg', frame)
+    return encoded.tobytes() if ret else None
+
+def _keyframe_seeking_available():
+    """
+    Keyframe seeking needs PyAV (the av package), which is optional.
+    """
+    return importlib.util.find_spec('av') is not None
+
+def _sample_percentages(samples, duration):
+    """
+    Positions of the frames to hash as fractions of the duration. samples is either those positions already,
+    or a sample count for the fixed time grid of video_sample_times (empty if the duration is unknown).
+    """
+    if isinstance(samples, int):
+        return tuple(time / duration for time in video_sample_times(duration, samples)) if duration > 0 else ()
+    return samples
+
+def _probe_video_exact(video_path, samples, preview_size):
+    """
+    Probe a video with OpenCV, seeking to the exact frame of every sample.
+    """
+    import cv2
+    from imagehash import phash
+    try:
+        file_size = os.path.getsize(video_path)
+    except OSError as e:
+        print(f"Error reading video {video_path}: {e}")
+        return None
+
+    cap = cv2.VideoCapture(video_path)
+    try:
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        if frame_count <= 0:
+            print(f"Video has no frames or could not be read: {video_path}")
+            return None
+
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        dimensions = (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        duration = frame_count / fps if fps > 0 else 0.0
+        percentages = _sample_percentages(samples, duration)
+        if not percentages:
+            print(f"Video has no frame rate, can not sample it by time: {video_path}")
+            return None
+
+        preview_index = min(range(len(percentages)), key=lambda index: abs(percentages[index] - 0.5))
+        preview = None
+        hashes = numpy.zeros(len(percentages), dtype=numpy.uint64)
+        for index in sorted(range(len(percentages)), key=lambda index: percentages[index]):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(frame_count * percentages[index]))
+            ret, frame = cap.read()
+            if not ret:
+                return None
+            hashes[index] = image_hash_to_int(phash(Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))))
+            if preview_size is not None and index == preview_index:
+                preview = _encode_preview(frame, preview_size)
+    finally:
+        cap.release()
+
+    return VideoRecord(video_path, hashes, dimensions[0] * dimensions[1], dimensions, file_size, fps, frame_count, duration, preview)
+
+def _probe_video_keyframes(video_path, samples, preview_size):
+    """
+    Probe a video with PyAV, hashing the keyframe at or before the timestamp of every sample.
+    Only one GOP is decoded per sample, so the cost barely depends on the length of the video.
+    """
+    import av
+    from imagehash import phash
+    try:
+        file_size = os.path.getsize(video_path)
+        with av.open(video_path) as container:
+            if not container.streams.video:
+                print(f"Video has no frames or could not be read: {video_path}")
+                return None
+            stream = container.streams.video[0]
+
+            if stream.duration is not None:
+                duration = float(stream.duration * stream.time_base)
+            elif container.duration is not None:
+                duration = container.duration / av.time_base
+            else:
+                print(f"Video has no duration, can not seek by timestamp: {video_path}")
+                return None
+
+            fps = float(stream.average_rate) if stream.average_rate else 0.0
+            frame_count = stream.frames or int(duration * fps)
+            dimensions = (stream.codec_context.width, stream.codec_context.height)
+            start_time = stream.start_time or 0
+            percentages = _sample_percentages(samples, duration)
+            if not percentages:
+                print(f"Video has no duration, can not seek by timestamp: {video_path}")
+                return None
+
+            preview_index = min(range(len(percentages)), key=lambda index: abs(percentages[index] - 0.5))
+            preview = None
+            hashes = numpy.zeros(len(percentages), dtype=numpy.uint64)
+            for index in sorted(range(len(percentages)), key=lambda index: percentages[index]):
+                # any_frame=False lands on the keyframe at or before the timestamp, so the first decoded frame is that keyframe
+                container.seek(start_time + int(duration * percentages[index] / stream.time_base), stream=stream, backward=True, any_frame=False)
+                frame = next(container.decode(stream), None)
+                if frame is None:
+                    return None
+                hashes[index] = image_hash_to_int(phash(frame.to_image()))
+                if preview_size is not None and index == preview_index:
+                    preview = _encode_preview(frame.to_ndarray(format='bgr24'), preview_size)
+    except Exception as e:
+        print(f"Error reading video {video_path}: {e}")
+        return None
+
+    return VideoRecord(video_path, hashes, dimensions[0] * dimensions[1], dimensions, file_size, fps, frame_count, duration, preview)
+
+def probe_video(video_path, samples=DEFAULT_FRAME_PERCENTAGES, preview_size=VIDEO_PREVIEW_SIZE, seek_mode='exact'):
+    """
+    Read the frame hashes and metadata of a video, opening it only once.
+    samples are the positions of the hashed frames as fractions of the duration, or a sample count to hash
+    frames on the fixed time grid of video_sample_times instead.
+    The sampled frames are visited in increasing order, so the container never seeks backwards.
+    The sampled frame closest to the middle doubles as the preview; pass preview_size=None to skip it.
+    seek_mode 'exact' hashes the exact frame at every position (OpenCV), 'keyframe' hashes the nearest
+    keyframe before it (PyAV), which is much faster on long videos. Without PyAV, 'keyframe' falls back to 'exact'.
+    Returns a VideoRecord, or None if the video or any sampled frame could not be read.
+    """
+    if seek_mode == 'keyframe' and _keyframe_seeking_available():
+        return _probe_video_keyframes(video_path, samples, preview_size)
+    elif seek_mode in ('exact', 'keyframe'):
+        return _probe_video_exact(video_path, samples, preview_size)
+    else:
+        raise ValueError(f"Unknown seek mode: {seek_mode}")
+
+def calculate_dynamic_phash_for_frames(video_path, percentages=DEFAULT_FRAME_PERCENTAGES):
     """
     Calculate perceptual hashes for frames at specific percentages of the video.
+    Returns the frame hashes packed into a uint64 array, or None if any frame could not be read.
+    """
+    record = probe_video(video_path, percentages, preview_size=None)
+    return None if record is None else record.hashes
+
+def video_sample_interval(duration, sample_count):
+    """
+    Seconds between the samples of the fixed time grid: the power of two that fits between sample_count / 2 and
+    sample_count samples into the video. Powers of two nest, so the samples of a video with a coarser grid are
+    also on the grid of a video with a finer one.
+    """
+    return 2.0 ** math.ceil(math.log2(duration / (sample_count + 1)))
+
+def video_sample_times(duration, sample_count):
+    """
+    Timestamps (in seconds) of the frames hashed with frame_samples: every video_sample_interval seconds, counted
+    from the start of the video. Samples sit at the same absolute times in every video, so a copy with a few seconds
+    trimmed off the start has its frames shifted by whole samples, which max_shift can absorb.
+    """
+    interval = video_sample_interval(duration, sample_count)
+    return tuple(index * interval for index in range(1, math.ceil(duration / interval)))
+
+def _aligned_signatures(hashes1, interval1, hashes2, interval2):
+    """
+    Bring two signatures sampled every interval1 and interval2 seconds to the coarser of both intervals,
+    by keeping only the samples of the finer one that are also on the coarser grid.
+    """
+    if interval1 < interval2:
+        step = round(interval2 / interval1)
+        hashes1 = hashes1[step - 1::step]
+    elif interval2 < interval1:
+        step = round(interval1 / interval2)
+        hashes2 = hashes2[step - 1::step]
+    return hashes1, hashes2
+
+def match_video_signatures(hashes1, hashes2, hash_threshold, max_shift=0, min_match=1.0, interval1=1.0, interval2=1.0):
+    """
+    Compare the frame hashes of two videos, allowing the frames to be shifted by up to max_shift samples
+    (for copies with an intro trimmed or a few seconds added). A frame matches if a frame of the other video
+    at most max_shift positions away is within hash_threshold bits. The videos match if at least min_match
+    of the frames of the shorter signature do. With max_shift=0 and min_match=1.0 every frame has to match its counterpart.
+    interval1 and interval2 are the seconds between the samples of signatures on the fixed time grid
+    (see video_sample_times), signatures with different intervals are compared on the coarser one.
+    """
+    hashes1, hashes2 = _aligned_signatures(hashes1, interval1, hashes2, interval2)
+    if not len(hashes1) or not len(hashes2):
+        return False
+    matched_frames = _matched_frame_count(hashes1, hashes2, hash_threshold, max_shift)
+    return matched_frames >= _required_matches(min(len(hashes1), len(hashes2)), min_match)
+
+def _frame_distances(hashes1, hashes2, max_shift):
+    """
+    Distance of every frame of the shorter signature to its closest frame of the other one within the shift window.
+    """
+    if len(hashes1) > len(hashes2):
+        hashes1, hashes2 = hashes2, hashes1
+    distances = hamming_distances(numpy.asarray(hashes1)[:, None], numpy.asarray(hashes2)[None, :])
+    outside_window = numpy.abs(numpy.arange(len(hashes1))[:, None] - numpy.arange(len(hashes2))[None, :]) > max_shift
+    distances[outside_window] = HASH_BITS
+    return distances.min(axis=1)
+
+def _matched_frame_count(hashes1, hashes2, hash_threshold, max_shift):
+    return int((_frame_distances(hashes1, hashes2, max_shift) <= hash_threshold).sum())
+
+def _required_matches(sample_count, min_match):
+    return max(1, math.ceil(sample_count * min_match - 1e-9))
+
+def _within_tolerance(value1, value2, tolerance):
+    # Unknown values (0, e.g. durations from old cache entries) never rule a pair out
+    if tolerance is None or not value1 or not value2:
+        return True
+    return abs(value1 - value2) <= tolerance * max(value1, value2)
+
+def _aspect_ratio(record):
+    width, height = record.dimensions
+    return width / height if width and height else 0.0
+
+def _tolerance_bucket(value, tolerance):
+    """
+    Bucket a positive value on a log scale, so any two values within the relative tolerance
+    land in the same or adjacent buckets. None means "unknown" and is adjacent to every bucket.
+    A tolerance of 0 asks for exact values, so the value itself (a float) is the bucket.
     """
-    frame_count = get_frame_count(video_path)
-    if frame_count == 0:
-        print(f"Video has no frames or could not be read: {video_path}")
+    if tolerance is None or tolerance >= 1 or not value:
         return None
+    if tolerance == 0:
+        return float(value)
+    return math.floor(math.log(value) / -math.log1p(-tolerance))
 
-    hashes = []
-    for percentage in percentages:
-        frame_number = int(frame_count * percentage)
-        frame = extract_frame(video_path, frame_number)
-        if frame:
-            frame_hash = phash(frame)
-            hashes.append(str(frame_hash))
-        else:
-            hashes.append(None)
-    return hashes
-
-def find_video_duplicates(folder_path, progress_callback=None, hash_threshold=2):
-    """
-    Find potential duplicate videos in a given folder by hashing multiple representative frames.
-    Returns a list of tuples, where each tuple contains the paths of potential duplicate videos and their frame hashes.
-    """
-    video_files_hash = {}
-    potential_duplicates = []  # Store potential duplicates
-    processed_videos = set()  # Track videos that are already processed
-
-    # Collect all video file paths
-    all_videos = []
-    for root, dirs, files in os.walk(folder_path):
-        for file in files:
-            if file.lower().endswith(('.mp4', '.avi', '.mov', '.mkv', '.wmv', '.flv', '.webm', '.mpeg', '.av1', '.m4s', '.mp4v', '.mpv')):  # Check for video file extensions
-                file_path = os.path.join(root, file)
-                all_videos.append(file_path)
-
-    total_videos = len(all_videos)
-    processed_videos_count = 0
-
-    # Process each video to get its representative frame hashes
-    with ProcessPoolExecutor() as executor:
-        future_to_video = {executor.submit(calculate_dynamic_phash_for_frames, file_path): file_path for file_path in all_videos}
-
-        results = []
-        for future in as_completed(future_to_video):
-            result = future.result()
-            file_path = future_to_video[future]
-            if result is None or any(h is None for h in result):
-                print(f"Skipping video due to frame extraction error: {file_path}")
-                continue
+def _adjacent_keys(key, all_keys):
+    """
+    Bucket keys adjacent to key in one dimension: log scale buckets (ints) are adjacent to their neighbours,
+    exact value buckets (floats) only to themselves, and unknown (None) to everything.
+    """
+    if key is None:
+        return all_keys
+    if isinstance(key, int):
+        return (key - 1, key, key + 1, None)
+    return (key, None)
 
-            # Calculate video resolution or other relevant metrics if needed
-            video_resolution = get_video_resolution(file_path)
-            results.append((file_path, result, video_resolution))
+def _sample_interval(record, frame_samples):
+    # Videos sampled at DEFAULT_FRAME_PERCENTAGES all have the same number of samples and are compared sample by sample
+    return 1.0 if frame_samples is None else video_sample_interval(record.duration, frame_samples)
 
-            processed_videos_count += 1
-            if progress_callback:
-                progress_callback(int((processed_videos_count / total_videos) * 100))
+def _match_video_records(results, hash_threshold, max_shift, min_match, duration_tolerance, aspect_tolerance, frame_samples=None):
+    """
+    Find the matching videos among the sorted video records and group them, see find_video_duplicates for the parameters.
+    Matches are transitive, and the first video of every group in sort order is its keeper.
+    """
+    matches = DisjointSet(len(results))
 
-    # Sort results by resolution (highest to lowest), then by filename length, then alphabetically
-    results.sort(key=lambda x: (-x[2][0] * x[2][1], len(os.path.basename(x[0])), os.path.basename(x[0])))
+    intervals = [_sample_interval(record, frame_samples) for record in results]
 
-    # Identify potential duplicates without making a decision on which to keep or delete
-    for i in range(len(results)):
-        video_path1, video_hashes1, resolution1 = results[i]
-        
-        if video_path1 in processed_videos:
-            continue  # Skip already processed videos
+    # Bucket the videos by duration and aspect ratio, and index the frame hashes of each bucket separately,
+    # so each video is only compared against similar videos sharing near-identical frames
+    buckets = [
+        (_tolerance_bucket(record.duration, duration_tolerance), _tolerance_bucket(_aspect_ratio(record), aspect_tolerance))
+        for record in results
+    ]
+    frame_indexes = {}
+    for position, record in enumerate(results):
+        frame_index = frame_indexes.get(buckets[position])
+        if frame_index is None:
+            frame_index = frame_indexes[buckets[position]] = create_hash_index(hash_threshold)
+        for frame_position, frame_hash in enumerate(record.hashes.tolist()):
+            frame_index.add(frame_hash, (position, frame_position))
+    # Look the neighbours of every bucket up by key, so this stays linear in the number of buckets
+    duration_keys = {duration_key for duration_key, aspect_key in frame_indexes}
+    aspect_keys = {aspect_key for duration_key, aspect_key in frame_indexes}
 
-        for j in range(i + 1, len(results)):
-            video_path2, video_hashes2, resolution2 = results[j]
+    def adjacent_indexes_of(bucket):
+        duration_key, aspect_key = bucket
+        return [
+            frame_indexes[(other_duration_key, other_aspect_key)]
+            for other_duration_key in _adjacent_keys(duration_key, duration_keys)
+            for other_aspect_key in _adjacent_keys(aspect_key, aspect_keys)
+            if (other_duration_key, other_aspect_key) in frame_indexes
+        ]
+    adjacent_indexes = {bucket: adjacent_indexes_of(bucket) for bucket in frame_indexes}
+    logging_wrapper.log_info(f"Split {len(results)} videos into {len(frame_indexes)} duration/aspect ratio buckets.")
 
-            if video_path2 in processed_videos:
-                continue  # Skip already processed videos
+    # Identify potential duplicates without making a decision on which to keep or delete
+    for i, video1 in enumerate(results):
+        # Collect, per later video, the frames of both videos that have a near match within the shift window
+        # (compared in seconds, the grids of the two videos can differ)
+        matched_frames = {}
+        for frame_index in adjacent_indexes[buckets[i]]:
+            for frame_position, frame_hash in enumerate(video1.hashes.tolist()):
+                for (j, other_frame_position), distance in frame_index.query(frame_hash, hash_threshold):
+                    if j <= i:
+                        continue
+                    shift = abs((frame_position + 1) * intervals[i] - (other_frame_position + 1) * intervals[j])
+                    if shift <= max_shift * max(intervals[i], intervals[j]):
+                        frames1, frames2 = matched_frames.setdefault(j, (set(), set()))
+                        frames1.add(frame_position)
+                        frames2.add(other_frame_position)
 
-            # Ensure same number of frames checked
-            if len(video_hashes1) != len(video_hashes2):
+        for j in sorted(matched_frames):
+            video2 = results[j]
+            # Neither side can have more matching frames in the full comparison than were found here
+            hashes1, hashes2 = _aligned_signatures(video1.hashes, intervals[i], video2.hashes, intervals[j])
+            if max(map(len, matched_frames[j])) < _required_matches(min(len(hashes1), len(hashes2)), min_match):
+                continue
+            if matches.find(i) == matches.find(j):
+                continue  # Already in the same group through other videos
+            if not _within_tolerance(video1.duration, video2.duration, duration_tolerance):
                 continue
+            if not _within_tolerance(_aspect_ratio(video1), _aspect_ratio(video2), aspect_tolerance):
+                continue
+            if match_video_signatures(hashes1, hashes2, hash_threshold, max_shift, min_match):
+                matches.union(i, j)
+
+    return matches.groups(results, lambda keeper, member: _signature_distance(
+        keeper.hashes, member.hashes, max_shift, min_match, _sample_interval(keeper, frame_samples), _sample_interval(member, frame_samples)
+    ))
+
+def _signature_distance(hashes1, hashes2, max_shift=0, min_match=1.0, interval1=1.0, interval2=1.0):
+    """
+    Distance between two frame signatures: how far the frames are from their closest frame of the other video
+    within the shift window, for the worst of the best min_match of the frames (the ones that made them match).
+    """
+    hashes1, hashes2 = _aligned_signatures(hashes1, interval1, hashes2, interval2)
+    if not len(hashes1) or not len(hashes2):
+        return HASH_BITS
+    frame_distances = numpy.sort(_frame_distances(hashes1, hashes2, max_shift))
+    return int(frame_distances[_required_matches(len(frame_distances), min_match) - 1])
+
+class _VideoScan(_MediaScan):
+    """
+    Video scan: probe every video for its frame hashes and metadata, and match the frame signatures.
+    """
+    kind = 'video'
+
+    def __init__(self, cache=None, alias_callback=None, hash_threshold=2, previews=True, seek_mode='exact', frame_samples=None,
+                 max_shift=0, min_match=1.0, duration_tolerance=0.1, aspect_tolerance=None, exact_match=False, chunksize=1, max_pending=None,
+                 keeper_policy=None):
+        if frame_samples is not None and frame_samples < 1:
+            raise ValueError(f"frame_samples has to be at least 1, got {frame_samples}.")
+        for name, tolerance in (('duration_tolerance', duration_tolerance), ('aspect_tolerance', aspect_tolerance)):
+            if tolerance is not None and tolerance < 0:
+                raise ValueError(f"{name} can not be negative, got {tolerance}.")
+        # frame_samples hashes frames on the fixed time grid instead of at fixed percentages
+        samples = DEFAULT_FRAME_PERCENTAGES if frame_samples is None else frame_samples
+        if seek_mode == 'keyframe' and not _keyframe_seeking_available():
+            logging_wrapper.log_info("PyAV is not installed, falling back to exact frame seeking.")
+            seek_mode = 'exact'
+
+        cache_params = (f"phash:{samples}" if frame_samples is None else f"phash:grid{frame_samples}") + (':keyframe' if seek_mode == 'keyframe' else '')
+        super().__init__(cache, cache_params, exact_match, alias_callback, chunksize, max_pending)
+        self.task = probe_video
+        self.task_args = (samples, VIDEO_PREVIEW_SIZE if previews else None, seek_mode)
+        self.match_options = (hash_threshold, max_shift, min_match, duration_tolerance, aspect_tolerance, frame_samples)
+        self.keeper_policy = keeper_policy or keep_highest_quality
+
+    def record_from_cache(self, file_path, key, cached):
+        file_hash, signature, video_resolution, metadata = cached
+        metadata = metadata or {}
+        return VideoRecord(
+            file_path, signature, video_resolution[0] * video_resolution[1], video_resolution, key[0],
+            metadata.get('fps', 0.0), metadata.get('frame_count', 0), metadata.get('duration', 0.0), None
+        )
+
+    def store_in_cache(self, record, key):
+        metadata = {'fps': record.fps, 'frame_count': record.frame_count, 'duration': record.duration}
+        self.cache.put(
+            record.path, key, 'video', self.cache_params,
+            signature=record.hashes, dimensions=record.dimensions, metadata=metadata
+        )
 
-            # Calculate the Hamming distance between the frame hashes
-            is_duplicate = all(
-                abs(hex_to_hash(h1) - hex_to_hash(h2)) <= hash_threshold
-                for h1, h2 in zip(video_hashes1, video_hashes2)
-            )
+    def add_task_result(self, file_path, result):
+        if result is None:
+            print(f"Skipping video due to frame extraction error: {file_path}")
+        super().add_task_result(file_path, result)
+
+    def match(self):
+        """
+        Match the collected videos. Returns a list of DuplicateGroups, see find_video_duplicates.
+        """
+        # Sort results by the keeper policy, so the first video of every group is its keeper
+        results = sorted(self.results, key=self.keeper_policy)
+        return _match_video_records(results, *self.match_options)
+
+def find_video_duplicates(folder_path, progress_callback=None, hash_threshold=2, cache=None, max_workers=None, chunksize=1, executor=None, previews=True, seek_mode='exact',
+                          frame_samples=None, max_shift=0, min_match=1.0, duration_tolerance=0.1, aspect_tolerance=None, exact_match=False,
+                          alias_callback=None, walk_options=None, media_files=None, keeper_policy=None):
+    """
+    Find potential duplicate videos in a given folder (or list of folders) by hashing multiple representative frames.
+    Returns a list of DuplicateGroups of VideoRecords, distances are the largest per-frame pHash distance to the keeper.
+    cache is an optional HashCache; unchanged videos are read from it instead of being decoded again.
+    Previews are never written to the cache, so videos taken from it have preview None.
+    previews=False skips encoding the preview frames, for callers that do not show them.
+    seek_mode is passed to probe_video. Keyframe hashes differ from exact-frame hashes, so keep to one mode per library.
+    frame_samples hashes frames on a fixed time grid instead of at DEFAULT_FRAME_PERCENTAGES: every video_sample_interval
+    seconds, between frame_samples / 2 and frame_samples frames per video. max_shift and min_match are passed to
+    match_video_signatures, so a copy with its start trimmed, whose frames are shifted by whole samples, still matches.
+    This works when the content changes more slowly than the samples are spaced.
+    duration_tolerance skips pairs whose durations differ by more than that fraction of the longer one (None disables it).
+    aspect_tolerance does the same for the aspect ratio (off by default, so cropped or letterboxed copies still match).
+    Videos are bucketed by both, and only compared against videos in the same or adjacent buckets.
+    exact_match works like it does for find_duplicates. It is off by default, because confirming a copy reads the
+    whole file, which for large videos takes longer than probing a few frames.
+    alias_callback, walk_options and media_files work like they do for find_duplicates (media_files of kind 'video').
+    max_workers, chunksize, executor and keeper_policy work like they do for find_duplicates.
+    """
+    if not folder_path and media_files is None:
+        return []
 
-            if is_duplicate:
-                potential_duplicates.append((video_path1, video_path2))  # Append potential duplicate pair
+    scan = _VideoScan(
+        cache, alias_callback, hash_threshold, previews, seek_mode, frame_samples,
+        max_shift, min_match, duration_tolerance, aspect_tolerance, exact_match, chunksize, keeper_policy=keeper_policy
+    )
+    if media_files is None:
+        media_files = scan_media(folder_path, {'video': VIDEO_EXTENSIONS}, alias_callback=alias_callback, **(walk_options or {}))
 
-        # Mark the current video as processed
-        processed_videos.add(video_path1)
+    # Probe each video for its frame hashes and metadata, while the folder is still being walked
+    with _use_executor(executor, max_workers) as pool:
+        _run_scans(pool, [scan], media_files, progress_callback)
 
-    return potential_duplicates
+    return scan.match()
 
 def get_video_resolution(video_path):
     """
     Get the resolution of a video as (width, height).
     """
-    cap = VideoCapture(video_path)
-    width = int(cap.get(CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(CAP_PROP_FRAME_HEIGHT))
+    import cv2
+    cap = cv2.VideoCapture(video_path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
     cap.release()
     return width, height  # Return width and height as a tuple
 
+def format_runtime(total_seconds):
+    """
+    Format a duration in seconds as HH:MM:SS.
+    """
+    hours = int(total_seconds // 3600)
+    minutes = int((total_seconds % 3600) // 60)
+    seconds = int(total_seconds % 60)
+    return f"{hours:02}:{minutes:02}:{seconds:02}"
+
 def get_video_runtime(video_path):
         """
         Get the runtime (duration) of the video in HH:MM:SS format.
         """
-        cap = VideoCapture(video_path)
-        fps = cap.get(CAP_PROP_FPS)
-        frame_count = int(cap.get(CAP_PROP_FRAME_COUNT))
+        import cv2
+        cap = cv2.VideoCapture(video_path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         cap.release()
 
-        total_seconds = frame_count / fps
-        hours = int(total_seconds // 3600)
-        minutes = int((total_seconds % 3600) // 60)
-        seconds = int(total_seconds % 60)
-        return f"{hours:02}:{minutes:02}:{seconds:02}"
\ No newline at end of file
+        return format_runtime(frame_count / fps)
+
+## MIXED MEDIA
+
+def find_media_duplicates(folder_path, progress_callback=None, cache=None, max_workers=None, executor=None, alias_callback=None, walk_options=None,
+                          image_options=None, video_options=None, max_pending_images=None, max_pending_videos=None):
+    """
+    Find duplicate images and videos in one pass: the folder (or list of folders) is walked once, and images
+    and videos are hashed on the same process pool at the same time.
+    Returns one list of DuplicateGroups, the image groups followed by the video groups
+    (the type of the keeper record tells them apart).
+    image_options and video_options are dicts with the matching options of find_duplicates and
+    find_video_duplicates (e.g. {'hash_threshold': 2}).
+    max_pending_images and max_pending_videos limit how many worker tasks of each type are in flight;
+    by default videos can occupy at most half of the workers, so images keep flowing next to long videos.
+    cache, max_workers, executor, alias_callback and walk_options work like they do for find_duplicates.
+    """
+    if not folder_path:
+        return []
+
+    if max_pending_videos is None:
+        max_pending_videos = max(1, (max_workers or os.cpu_count() or 1) // 2)
+
+    image_scan = _ImageScan(cache, alias_callback, max_pending=max_pending_images, **(image_options or {}))
+    video_scan = _VideoScan(cache, alias_callback, max_pending=max_pending_videos, **(video_options or {}))
+    kinds = {'image': IMAGE_EXTENSIONS, 'video': VIDEO_EXTENSIONS}
+    media_files = scan_media(folder_path, kinds, alias_callback=alias_callback, **(walk_options or {}))
+
+    with _use_executor(executor, max_workers) as pool:
+        _run_scans(pool, [image_scan, video_scan], media_files, progress_callback)
+
+    return image_scan.match() + video_scan.match()
\ No newline at end of file
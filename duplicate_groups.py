@@ -0,0 +1,108 @@
+"""
+Duplicate groups.
+
+A scan reports every set of duplicate files as one group: the file to keep
+and the other members, each with its hash distance to the keeper. Twenty
+copies of a photo are one group with nineteen members, instead of a pair for
+every combination, so whatever consumes the results does work proportional to
+the files involved.
+
+Groups are built with union-find, so matches are transitive: if A matches B
+and B matches C, all three end up in one group even when A and C are further
+apart than the threshold. Which file of a group is kept is decided by a keeper
+policy, independent of the order the files were found or matched in.
+"""
+
+import os
+from array import array
+
+
+class DuplicateGroup:
+    """
+    A set of duplicate files. keeper is the record of the file to keep, members the records of its duplicates
+    and distances the hash distance of each member to the keeper (same order as members).
+    """
+    __slots__ = ('keeper', 'members', 'distances')
+
+    def __init__(self, keeper, members=None, distances=None):
+        self.keeper = keeper
+        self.members = members if members is not None else []
+        self.distances = distances if distances is not None else []
+
+    def add(self, member, distance):
+        self.members.append(member)
+        self.distances.append(distance)
+
+    def pairs(self):
+        """
+        Yield (keeper, member, distance) for every member.
+        """
+        for member, distance in zip(self.members, self.distances):
+            yield self.keeper, member, distance
+
+    def __len__(self):
+        return 1 + len(self.members)
+
+    def __iter__(self):
+        yield self.keeper
+        yield from self.members
+
+    def __repr__(self):
+        return f"DuplicateGroup(keeper={self.keeper.path!r}, members={[member.path for member in self.members]!r})"
+
+
+def keep_highest_quality(record):
+    """
+    Default keeper policy: the highest resolution, then the largest file, then the shortest name (alphabetically
+    first among equals) is kept. A keeper policy maps a record to a sort key, the record that sorts first is kept.
+    """
+    name = os.path.basename(record.path)
+    return (-record.resolution, -record.file_size, len(name), name, record.path)
+
+
+class DisjointSet:
+    """
+    Union-find over the positions 0..size-1, for grouping items connected by matching pairs.
+    Pairs are added one by one as they are found, so only the two arrays below are kept, however many pairs there are.
+    """
+
+    def __init__(self, size):
+        self.parent = array('q', range(size))
+        self.set_size = array('q', [1]) * size
+
+    def find(self, position):
+        root = position
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Path compression: point everything on the way straight at the root
+        while self.parent[position] != root:
+            self.parent[position], position = root, self.parent[position]
+        return root
+
+    def union(self, position1, position2):
+        root1, root2 = self.find(position1), self.find(position2)
+        if root1 == root2:
+            return
+        # Union by size keeps the trees shallow
+        if self.set_size[root1] < self.set_size[root2]:
+            root1, root2 = root2, root1
+        self.parent[root2] = root1
+        self.set_size[root1] += self.set_size[root2]
+
+    def groups(self, records, distance):
+        """
+        Build a DuplicateGroup for every set with more than one item. records are the items in keeper policy order,
+        so the lowest position of a set is its keeper. distance(keeper, member) gives the distance of each member.
+        Returns the groups in the order of their keepers.
+        """
+        groups = {}  # Root -> DuplicateGroup
+        for position, record in enumerate(records):
+            root = self.find(position)
+            if self.set_size[root] < 2:
+                continue
+            group = groups.get(root)
+            if group is None:
+                groups[root] = DuplicateGroup(record)
+            else:
+                group.add(record, distance(group.keeper, record))
+        return list(groups.values())
@@ -1,13 +1,15 @@
 import sys
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, QMessageBox, QScrollArea, QVBoxLayout, QWidget, QHBoxLayout, QFrame, QSpacerItem, QSizePolicy, QCheckBox, QDialog, QComboBox, QRadioButton, QProgressBar
+    QApplication, QMainWindow, QLabel, QPushButton, QFileDialog, QMessageBox, QVBoxLayout, QWidget, QHBoxLayout, QFrame, QSpacerItem, QSizePolicy, QDialog, QComboBox, QRadioButton, QProgressBar,
+    QListView, QStyledItemDelegate
 )
-from PyQt5.QtGui import QPixmap, QFont, QImage, QIcon
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QUrl, QObject, pyqtSlot
-from duplicate_detector import find_duplicates, get_image_resolution, get_frame_count, find_video_duplicates, get_video_resolution, get_video_runtime  # Import the duplicate detection module
+from PyQt5.QtGui import QPixmap, QFont, QImage, QIcon, QColor, QPen
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QUrl, QObject, pyqtSlot, QAbstractListModel, QModelIndex, QSize, QRect, QEvent, QRunnable, QThreadPool
+from duplicate_detector import find_duplicates, hash_to_hex, find_video_duplicates, find_media_duplicates, format_runtime, VideoRecord  # Import the duplicate detection module
 import os
-from random import getrandbits
-from cv2 import VideoCapture, cvtColor, COLOR_BGR2RGB, CAP_PROP_POS_FRAMES
+from array import array
+from collections import OrderedDict
+from PIL import Image
 from pywinstyles import apply_style
 from PyQt5.QtWebEngineWidgets import QWebEngineView
 from PyQt5.QtWebChannel import QWebChannel
@@ -41,6 +43,8 @@ class Bridge(QObject):
             self.window.scanmode = "video"  # Call the video mode processing
         elif button_id == "photo_mode":
             self.window.scanmode = "photo"  # Call the photo mode processing
+        elif button_id == "media_mode":
+            self.window.scanmode = "media"  # Search photos and videos in one pass
         elif button_id == 'okay_button':
             if isinstance(self.window, QDialog):
                 self.window.accept()
@@ -66,14 +70,14 @@ def resource_path(relative_path):
     base_path = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
     return os.path.join(base_path, relative_path)
 
-def convert_frame_to_pixmap(frame):
+def format_file_size(size):
     """
-    Convert an OpenCV frame to QPixmap for display.
+    Format a file size in bytes for display, e.g. 2.4 MB.
     """
-    height, width, channel = frame.shape
-    bytes_per_line = 3 * width
-    q_image = QImage(frame.data, width, height, bytes_per_line, QImage.Format_RGB888)
-    return QPixmap.fromImage(q_image)
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024 or unit == 'GB':
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
 
 def truncate_name(name, max_length=50):
     """
@@ -149,7 +153,7 @@ class DuplicateImageFinder(QMainWindow):
 
         # Radio buttons
         self.radio_buttons = QWebEngineView(self)
-        self.radio_buttons.setFixedSize(250,90)
+        self.radio_buttons.setFixedSize(250,130)
         self.radio_buttons.setUrl(QUrl.fromLocalFile(resource_path('resources/radio_buttons/buttons.html')))
         self.radio_buttons.move((self.width - 250) // 2, 485)
         self.scanmode = "photo"
@@ -164,7 +168,7 @@ class DuplicateImageFinder(QMainWindow):
         self.start_button = QWebEngineView(self)
         self.start_button.setFixedSize(300,120)
         self.start_button.setUrl(QUrl.fromLocalFile(resource_path('resources/start_button/button.html')))
-        self.start_button.move((self.width - 300) // 2, 575)
+        self.start_button.move((self.width - 300) // 2, 615)
 
         # Set up the web channel to communicate with JS
         self.start_channel = QWebChannel(self.start_button.page())
@@ -241,6 +245,13 @@ class DuplicateImageFinder(QMainWindow):
             self.show_comparison_window(comparison_results)
         elif self.scanmode == "video":
             self.show_comparison_window_videos(comparison_results)
+        elif self.scanmode == "media":
+            # Media scans come back as [image groups, video groups], show a window for each type that has any
+            image_groups, video_groups = comparison_results
+            if image_groups:
+                self.show_comparison_window(image_groups)
+            if video_groups:
+                self.show_comparison_window_videos(video_groups)
         else:
             logging_wrapper.log_error('No scanmode chosen...')
 
@@ -254,19 +265,339 @@ class DuplicateImageFinder(QMainWindow):
         self.progress_bar.setValue(0)
 
 
-    def show_comparison_window(self, comparison_results):
-        self.comparison_window = ComparisonWindow(comparison_results)
+    def show_comparison_window(self, groups):
+        self.comparison_window = ComparisonWindow(groups)
         logging_wrapper.log_info("Drawing comparison window...")
         self.comparison_window.show()
 
-    def show_comparison_window_videos(self, video_comparison_results):
-        self.comparison_window_videos = ComparisonWindowVideo(video_comparison_results)
+    def show_comparison_window_videos(self, video_groups):
+        self.comparison_window_videos = ComparisonWindowVideo(video_groups)
         logging_wrapper.log_info("Drawing comparison video window...")
         self.comparison_window_videos.show()
 
 
+def load_image_thumbnail(path, size=(370, 500)):
+    """
+    Decode an image at (about) thumbnail size and return it as a QImage, or None if it can not be read.
+    Runs on a thumbnail thread: PIL's draft mode lets JPEGs decode at a fraction of their size,
+    and QImage (unlike QPixmap) can be created outside the GUI thread.
+    """
+    try:
+        with Image.open(path) as img:
+            img.draft('RGB', size)
+            img.thumbnail(size)
+            img = img.convert('RGBA')
+            image = QImage(img.tobytes(), img.width, img.height, QImage.Format_RGBA8888).copy()
+    except Exception as e:
+        print(f"Could not load a preview of {path}: {e}")
+        return None
+    if image.width() < size[0] and image.height() < size[1]:
+        # Small images are shown enlarged, like the full-size previews were
+        image = image.scaled(size[0], size[1], Qt.KeepAspectRatio)
+    return image
+
+
+def load_video_thumbnail(path, preview=None, size=(370, 500)):
+    """
+    Build the preview of a video as a QImage from a JPEG frame kept by the scan (preview), or by reading the
+    middle frame. The GUI scans without previews, so frames are only read for videos that are shown in a
+    review window. Returns None on failure. Runs on a thumbnail thread.
+    """
+    if preview is not None:
+        image = QImage.fromData(preview)
+    else:
+        import cv2  # Only needed for video previews
+        cap = cv2.VideoCapture(path)
+        try:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) // 2)
+            ret, frame = cap.read()
+        finally:
+            cap.release()
+        if not ret:
+            print(f"Could not load a preview of {path}")
+            return None
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        height, width = frame.shape[:2]
+        image = QImage(frame.data, width, height, 3 * width, QImage.Format_RGB888).copy()
+    if image.isNull():
+        return None
+    return image.scaled(size[0], size[1], Qt.KeepAspectRatio)
+
+
+class _ThumbnailSignals(QObject):
+    done = pyqtSignal(str, object, bool)  # key, QImage (None if it could not be loaded), skipped
+
+
+class _ThumbnailTask(QRunnable):
+    def __init__(self, key, load, loader):
+        super().__init__()
+        self.key = key
+        self.load = load
+        self.loader = loader
+        self.signals = _ThumbnailSignals()
+
+    def run(self):
+        # Rows that scrolled far away before their turn came are not decoded anymore
+        if self.key not in self.loader.wanted:
+            self.signals.done.emit(self.key, None, True)
+            return
+        self.signals.done.emit(self.key, self.load(), False)
+
+
+class ThumbnailLoader(QObject):
+    """
+    Loads previews on a thread pool and keeps them in an LRU cache limited to max_bytes.
+    get() returns a cached preview or None, request() schedules a load(), a callable that runs on a pool thread
+    and returns a QImage. thumbnail_ready is emitted when a requested preview arrives.
+    """
+    thumbnail_ready = pyqtSignal(str)
+
+    def __init__(self, default_pixmap, max_bytes=128 * 1024 * 1024, parent=None):
+        super().__init__(parent)
+        self.default_pixmap = default_pixmap  # Shown for files that could not be loaded
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()  # Key -> QPixmap, least recently used first
+        self.cache_bytes = 0
+        self.pending = {}  # Key -> task that was queued
+        self.wanted = set()  # Keys of the rows on or near the screen
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(8, (os.cpu_count() or 2) - 1)))
+
+    def get(self, key):
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            self.cache.move_to_end(key)
+        return pixmap
+
+    def request(self, key, load):
+        self.wanted.add(key)
+        if key in self.cache or key in self.pending:
+            return
+        task = _ThumbnailTask(key, load, self)
+        task.signals.done.connect(self.on_done)
+        self.pending[key] = task
+        self.pool.start(task)
+
+    def set_wanted(self, keys):
+        """
+        Replace the keys that are still needed, queued loads for any other key are skipped.
+        """
+        self.wanted = set(keys)
+
+    def on_done(self, key, image, skipped):
+        self.pending.pop(key, None)
+        if skipped:
+            return
+        pixmap = QPixmap.fromImage(image) if image is not None and not image.isNull() else self.default_pixmap
+        self.cache[key] = pixmap
+        self.cache_bytes += pixmap.width() * pixmap.height() * 4
+        while self.cache_bytes > self.max_bytes and len(self.cache) > 1:
+            old_key, old_pixmap = self.cache.popitem(last=False)
+            self.cache_bytes -= old_pixmap.width() * old_pixmap.height() * 4
+        self.thumbnail_ready.emit(key)
+
+
+class ComparisonListModel(QAbstractListModel):
+    """
+    The duplicates shown in a review window, one row for every member of every DuplicateGroup,
+    shown next to the keeper of its group. Rows are two arrays of (group, member) positions, and whether
+    a duplicate is marked for deletion is kept in a bytearray, one byte per row, instead of a checkbox widget.
+    """
+    marked_changed = pyqtSignal()
+
+    def __init__(self, groups):
+        super().__init__()
+        self.groups = groups
+        self.row_groups = array('l')
+        self.row_members = array('l')
+        for group_position, group in enumerate(groups):
+            self.row_groups.extend([group_position] * len(group.members))
+            self.row_members.extend(range(len(group.members)))
+        self.marked = bytearray(b'\x01') * len(self.row_groups)  # Everything starts marked for deletion
+
+    def comparison(self, row):
+        """
+        Return the (keeper, member) records shown in a row.
+        """
+        group = self.groups[self.row_groups[row]]
+        return group.keeper, group.members[self.row_members[row]]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.row_groups)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return self.comparison(index.row())
+        if role == Qt.CheckStateRole:
+            return Qt.Checked if self.marked[index.row()] else Qt.Unchecked
+        return None
+
+    def setData(self, index, value, role=Qt.EditRole):
+        if not index.isValid() or role != Qt.CheckStateRole:
+            return False
+        self.marked[index.row()] = 1 if value == Qt.Checked else 0
+        self.dataChanged.emit(index, index, [Qt.CheckStateRole])
+        self.marked_changed.emit()
+        return True
+
+    def flags(self, index):
+        return Qt.ItemIsEnabled | Qt.ItemIsUserCheckable
+
+    def marked_count(self):
+        return self.marked.count(1)
+
+    def marked_files(self):
+        """
+        Return (to_keep_path, to_delete_path) for every duplicate that is marked for deletion.
+        """
+        marked_files = []
+        for row, marked in enumerate(self.marked):
+            if marked:
+                keeper, member = self.comparison(row)
+                marked_files.append((keeper.path, member.path))
+        return marked_files
+
+
+class ComparisonDelegate(QStyledItemDelegate):
+    """
+    Paints one comparison row of a review window: the details of both files, their previews side by side
+    and the "Mark For Deletion" checkbox. Only the rows on screen are painted, no widgets are created per row.
+    describe(record) returns the details text of a file, preview(record) its QPixmap (None while it is loading).
+    """
+    PREVIEW_SIZE = (370, 500)
+    TEXT_HEIGHT = 100
+    CHECKBOX_HEIGHT = 40
+    ROW_HEIGHT = TEXT_HEIGHT + PREVIEW_SIZE[1] + 20 + CHECKBOX_HEIGHT + 30
+
+    def __init__(self, describe, preview, parent=None):
+        super().__init__(parent)
+        self.describe = describe
+        self.preview = preview
+        self.text_font = QFont('Segoe UI', 10)
+        self.text_font.setBold(True)
+        self.checkbox_font = QFont('Segoe UI', 14)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), self.ROW_HEIGHT)
+
+    def checkbox_rect(self, row_rect):
+        # The indicator and its label, centered below the previews
+        top = row_rect.top() + self.TEXT_HEIGHT + self.PREVIEW_SIZE[1] + 20
+        return QRect(row_rect.center().x() - 100, top, 200, self.CHECKBOX_HEIGHT)
+
+    def paint(self, painter, option, index):
+        to_keep, to_delete = index.data(Qt.DisplayRole)
+        marked = index.data(Qt.CheckStateRole) == Qt.Checked
+        rect = option.rect
+        painter.save()
+
+        # File details, the file to keep on the left in green, the duplicate on the right in red
+        painter.setFont(self.text_font)
+        text_rect = QRect(rect.left() + 10, rect.top() + 10, rect.width() - 20, self.TEXT_HEIGHT - 10)
+        painter.setPen(QColor('green'))
+        painter.drawText(text_rect, Qt.AlignLeft | Qt.AlignTop, self.describe(to_keep))
+        painter.setPen(QColor('red'))
+        painter.drawText(text_rect, Qt.AlignRight | Qt.AlignTop, self.describe(to_delete))
+
+        # Previews, each centered in its half of the row
+        for entry, left in ((to_keep, rect.left()), (to_delete, rect.left() + rect.width() // 2)):
+            pixmap = self.preview(entry)
+            if pixmap is None:
+                continue
+            x = left + (rect.width() // 2 - pixmap.width()) // 2
+            y = rect.top() + self.TEXT_HEIGHT + (self.PREVIEW_SIZE[1] - pixmap.height()) // 2
+            painter.drawPixmap(x, y, pixmap)
+
+        # Checkbox
+        checkbox_rect = self.checkbox_rect(rect)
+        indicator = QRect(checkbox_rect.left(), checkbox_rect.center().y() - 9, 18, 18)
+        painter.setPen(QPen(QColor('white'), 2))
+        painter.setBrush(QColor('#932CC3') if marked else QColor('#333333'))
+        painter.drawRect(indicator)
+        painter.setFont(self.checkbox_font)
+        painter.drawText(checkbox_rect.adjusted(28, 0, 0, 0), Qt.AlignLeft | Qt.AlignVCenter, "Mark For Deletion")
+
+        # Separator
+        if index.row() < index.model().rowCount() - 1:
+            painter.fillRect(QRect(rect.left(), rect.bottom() - 3, rect.width(), 4), QColor('#932CC3'))
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.MouseButtonRelease and event.button() == Qt.LeftButton and self.checkbox_rect(option.rect).contains(event.pos()):
+            marked = index.data(Qt.CheckStateRole) == Qt.Checked
+            return model.setData(index, Qt.Unchecked if marked else Qt.Checked, Qt.CheckStateRole)
+        return False
+
+
+# Rows above and below the screen whose previews are loaded ahead of scrolling
+PREFETCH_ROWS = 3
+
+def create_comparison_list(groups, describe, preview, prefetch=None):
+    """
+    Build the list view of a review window for a list of DuplicateGroups, with the model and delegate above.
+    prefetch(records) is called with the rows on screen and PREFETCH_ROWS around them whenever the list scrolls,
+    so their previews can be loaded before they come into view.
+    """
+    list_view = QListView()
+    model = ComparisonListModel(groups)
+    list_view.setModel(model)
+    list_view.setItemDelegate(ComparisonDelegate(describe, preview, list_view))
+    list_view.setUniformItemSizes(True)  # Every row has the same height, so the view never measures all of them
+    list_view.setSelectionMode(QListView.NoSelection)
+    list_view.setVerticalScrollMode(QListView.ScrollPerPixel)
+    list_view.verticalScrollBar().setSingleStep(30)
+    list_view.setStyleSheet("""
+        QScrollBar:vertical {
+            border: none;
+            background-color: #2d2d2d;  /* Dark background color */
+            width: 10px;  /* Adjust the width of the scrollbar */
+            margin: 0px 0px 0px 0px;
+        }
+
+        QScrollBar::handle:vertical {
+            background-color: #932CC3;  /* Lighter gray for the handle */
+            min-height: 30px;  /* Minimum height for the handle */
+            border-radius: 5px;  /* Rounded corners for the handle */
+        }
+
+        QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+            background: none;  /* Remove arrows (if you want) */
+            height: 0px;  /* Set height to 0 to hide arrows */
+        }
+
+        QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+            background: none;  /* Background for pages (if you want to remove) */
+        }
+
+        QListView {
+            border: 2px solid #932CC3;
+        }
+    """)
+
+    if prefetch is not None:
+        def prefetch_visible():
+            row_count = model.rowCount()
+            if not row_count:
+                return
+            first = list_view.indexAt(list_view.viewport().rect().topLeft()).row()
+            last = list_view.indexAt(list_view.viewport().rect().bottomLeft()).row()
+            first = max(0, first if first >= 0 else 0)
+            last = last if last >= 0 else min(row_count - 1, first + 1)
+            # Rows on screen first, then the ones below (scrolling down is more common), then the ones above
+            rows = list(range(first, last + 1))
+            rows += range(last + 1, min(row_count, last + 1 + PREFETCH_ROWS))
+            rows += range(first - 1, max(-1, first - 1 - PREFETCH_ROWS), -1)
+            prefetch([record for row in rows for record in model.comparison(row)])
+
+        list_view.verticalScrollBar().valueChanged.connect(prefetch_visible)
+        list_view.verticalScrollBar().rangeChanged.connect(prefetch_visible)
+    return list_view
+
+
 class ComparisonWindow(QMainWindow):
-    def __init__(self, comparison_results):
+    def __init__(self, groups):
         super().__init__()
 
         self.setWindowTitle('Review Duplicates')
@@ -318,68 +649,13 @@ class ComparisonWindow(QMainWindow):
 
         self.main_layout.addWidget(titles_widget)
 
-        # Scroll area for viewing duplicates
-        self.scroll_area = QScrollArea(self)
-        self.scroll_area.setWidgetResizable(True) ##932CC3
-        self.scroll_area.setStyleSheet("""
-            QScrollBar:vertical {
-                border: none;
-                background-color: #2d2d2d;  /* Dark background color */
-                width: 10px;  /* Adjust the width of the scrollbar */
-                margin: 0px 0px 0px 0px;
-            }
-
-            QScrollBar::handle:vertical {
-                background-color: #932CC3;  /* Lighter gray for the handle */
-                min-height: 30px;  /* Minimum height for the handle */
-                border-radius: 5px;  /* Rounded corners for the handle */
-            }
-
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                background: none;  /* Remove arrows (if you want) */
-                height: 0px;  /* Set height to 0 to hide arrows */
-            }
-
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;  /* Background for pages (if you want to remove) */
-            }
-            
-            QScrollArea {
-                border: 2px solid #932CC3;                           
-            }
-        """)
-
-        # Widget to hold all duplicate comparisons
-        self.container_widget = QWidget()
-        self.scroll_area.setWidget(self.container_widget)
-
-        # Layout to arrange the duplicate comparisons vertically
-        self.layout = QVBoxLayout(self.container_widget)
-
-        self.main_layout.addWidget(self.scroll_area)
-
-        # Progress bar for loading widgets
-        self.progress_bar = QProgressBar(self)
-        self.progress_bar.setValue(0)
-        self.progress_bar.setTextVisible(True)  # Show text inside the progress bar
-        self.progress_bar.setFormat("Loading Duplicates... %p%")  # Custom text format inside the progress bar
-        self.progress_bar.setAlignment(Qt.AlignCenter)  # Align text to center
-
-        # Style the progress bar
-        self.progress_bar.setStyleSheet("""
-            QProgressBar {
-                border: 2px solid grey;
-                border-radius: 5px;
-                text-align: center;  /* Align text to center */
-                background-color: white;
-                color: black;  /* Text color inside the progress bar */
-            }
-            QProgressBar::chunk {
-                background-color: #AA39A9;  /* Change the progress color */
-                width: 20px;
-            }
-        """)
-        self.main_layout.addWidget(self.progress_bar)
+        # Only the rows on screen are painted, so opening the window takes the same time for any number of duplicates
+        self.thumbnails = ThumbnailLoader(self.default_pixmap.scaled(370, 500, Qt.KeepAspectRatio), parent=self)
+        self.list_view = create_comparison_list(groups, self.describe_image, self.image_preview, self.prefetch_images)
+        self.thumbnails.thumbnail_ready.connect(self.list_view.viewport().update)
+        self.model = self.list_view.model()
+        self.model.marked_changed.connect(self.update_delete_button_text)
+        self.main_layout.addWidget(self.list_view)
 
         # Progress bar for deleting
         self.delete_progress_bar = QProgressBar(self)
@@ -405,11 +681,6 @@ class ComparisonWindow(QMainWindow):
         """)
         self.main_layout.addWidget(self.delete_progress_bar)
 
-        # Store references to checkboxes and associated paths
-        self.checkboxes = {}
-        self.comparison_results = comparison_results
-        self.current_index = 0
-
         # Delete button, initially hidden
         #self.delete_button = QPushButton('Review Deletion', self)
         #self.delete_button.clicked.connect(self.show_deletion_dialog)
@@ -436,7 +707,6 @@ class ComparisonWindow(QMainWindow):
         self.delete_button = QWebEngineView(self)
         self.delete_button.setFixedSize(300,55)
         self.delete_button.setUrl(QUrl.fromLocalFile(resource_path('resources/review_button/button.html')))
-        self.delete_button.hide()
 
         self.delete_channel = QWebChannel(self.delete_button.page())
         self.bridge = Bridge(self)
@@ -450,160 +720,32 @@ class ComparisonWindow(QMainWindow):
 
         self.main_layout.addLayout(button_layout)
 
-        # Initialize the batch size
-        self.batch_size = 8  # Number of items to load per batch
-        # Timer for incremental loading
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.load_next_batch)
-        self.timer.start(10)  # Adjust the interval as needed
+        # Show the delete button once its page had a moment to load
+        QTimer.singleShot(100, self.update_delete_button_text)
 
         central_widget = QWidget()
         central_widget.setLayout(self.main_layout)
         self.setCentralWidget(central_widget)
 
-    def load_next_batch(self):
-        """Load the next batch of comparison widgets."""
-        for _ in range(self.batch_size):
-            if self.current_index >= len(self.comparison_results):
-                self.timer.stop()
-                # Hide progress bar and show delete button when done
-                self.progress_bar.hide()
-                self.delete_button.show()
-                # Add a slight delay before updating the button text
-                QTimer.singleShot(100, self.update_delete_button_text)
-                return
+    def describe_image(self, image):
+        width, height = image.dimensions
+        return (f"NAME: {truncate_name(os.path.basename(image.path))}\nRESOLUTION: {width}x{height}\nSIZE: {format_file_size(image.file_size)}"
+                f"\nP-HASH: {hash_to_hex(image.hash)}\nLOCATION: {os.path.basename(os.path.dirname(image.path))}")
 
-            to_keep, to_delete = self.comparison_results[self.current_index]
-            self.create_comparison_widget(to_keep, to_delete)
-            self.current_index += 1
-
-            # Update progress bar
-            self.progress_bar.setValue(int((self.current_index / len(self.comparison_results)) * 100))
-
-    def create_comparison_widget(self, to_keep, to_delete):
-        """Create and add widgets based on the provided data."""
-        to_keep_path, to_keep_name, to_keep_res, to_keep_folder, to_keep_phash = to_keep
-        to_delete_path, to_delete_name, to_delete_res, to_delete_folder, to_delete_phash = to_delete
-
-        # Truncate names if too long
-        to_keep_name = truncate_name(to_keep_name)
-        to_delete_name = truncate_name(to_delete_name)
-
-        comparison_widget = QWidget()
-        comparison_layout = QVBoxLayout(comparison_widget)
-        comparison_layout.setSpacing(0)
-
-        # Horizontal layout for filenames and resolutions
-        filenames_widget = QWidget()
-        filenames_layout = QHBoxLayout(filenames_widget)
-        filenames_layout.setSpacing(10)
-
-        to_keep_name_label = QLabel(f"NAME: {to_keep_name}\nRESOLUTION: {to_keep_res[0]}x{to_keep_res[1]}\nP-HASH: {to_keep_phash}\nLOCATION: {to_keep_folder}")
-        to_keep_name_label.setAlignment(Qt.AlignLeft)
-        to_keep_name_label.setFont(QFont('Segoe UI', 10))
-        to_keep_name_label.setStyleSheet("color: green; font-weight: bold;")
-
-        to_delete_name_label = QLabel(f"NAME: {to_delete_name}\nRESOLUTION: {to_delete_res[0]}x{to_delete_res[1]}\nP-HASH: {to_delete_phash}\nLOCATION: {to_delete_folder}")
-        to_delete_name_label.setAlignment(Qt.AlignRight)
-        to_delete_name_label.setFont(QFont('Segoe UI', 10))
-        to_delete_name_label.setStyleSheet("color: red; font-weight: bold;")
-
-        filenames_layout.addWidget(to_keep_name_label)
-        filenames_layout.addStretch()
-        filenames_layout.addWidget(to_delete_name_label)
-
-        comparison_layout.addWidget(filenames_widget)
-
-        # Horizontal layout for images
-        images_widget = QWidget()
-        images_layout = QHBoxLayout(images_widget)
-        images_layout.setSpacing(10)
-
-        to_keep_label = QLabel()
-        to_keep_pixmap = QPixmap(to_keep_path)
-        if to_keep_pixmap.isNull():
-            to_keep_pixmap = self.default_pixmap.scaled(370,500,Qt.KeepAspectRatio)
-        to_keep_label.setPixmap(to_keep_pixmap.scaled(370, 500, Qt.KeepAspectRatio))
-
-
-        to_delete_label = QLabel()
-        to_delete_pixmap = QPixmap(to_delete_path)
-        if to_delete_pixmap.isNull():
-            to_delete_pixmap = self.default_pixmap.scaled(370,500,Qt.KeepAspectRatio)
-        to_delete_label.setPixmap(to_delete_pixmap.scaled(370, 500, Qt.KeepAspectRatio))
-
-
-        images_layout.addStretch()
-        images_layout.addWidget(to_keep_label)
-        images_layout.addStretch()
-        images_layout.addWidget(to_delete_label)
-        images_layout.addStretch()
-
-        comparison_layout.addWidget(images_widget)
-
-        # Add space above checkbox
-        space_above_checkbox = QSpacerItem(20, 20, QSizePolicy.Minimum, QSizePolicy.Fixed)
-        comparison_layout.addItem(space_above_checkbox)
-
-        # Add a checkbox below the images to decide deletion
-        checkbox_layout = QHBoxLayout()
-        checkbox_layout.addStretch()
-
-        delete_checkbox = QCheckBox("Mark For Deletion")
-        delete_checkbox.setStyleSheet('color: white;')
-        delete_checkbox.setFont(QFont('Segoe UI', 14))
-        delete_checkbox.setChecked(True)
-        delete_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: white;
-                font-size: 14pt; /* Font size */
-            }
-            QCheckBox::indicator {
-                width: 18px; /* Width of the checkbox */
-                height: 18px; /* Height of the checkbox */
-            }
-            QCheckBox::indicator:checked {
-                background-color: #932CC3; /* Custom color for checked state */
-                border: 2px solid white; /* Border color and size */
-            }
-            QCheckBox::indicator:unchecked {
-                background-color: #333333; /* Custom color for unchecked state */
-                border: 2px solid white; /* Border color and size */
-            }
-        """)
-
-        # Connect state change signal to update function
-        delete_checkbox.stateChanged.connect(self.update_delete_button_text)
+    def image_preview(self, image):
+        # Previews are decoded on the thumbnail threads, the row is painted again once its preview arrives
+        pixmap = self.thumbnails.get(image.path)
+        if pixmap is None:
+            self.thumbnails.request(image.path, lambda path=image.path: load_image_thumbnail(path))
+        return pixmap
 
-        checkbox_layout.addWidget(delete_checkbox)
+    def prefetch_images(self, images):
+        self.thumbnails.set_wanted(image.path for image in images)
+        for image in images:
+            self.thumbnails.request(image.path, lambda path=image.path: load_image_thumbnail(path))
 
-        checkbox_layout.addStretch()
-        comparison_layout.addLayout(checkbox_layout)
-
-        self.checkboxes[delete_checkbox] = (to_keep_path, to_delete_path)
-
-        # Add space between the images and the separator
-        space_above_separator = QSpacerItem(20, 30, QSizePolicy.Minimum, QSizePolicy.Fixed)
-        comparison_layout.addItem(space_above_separator)
-
-        # Separator
-        if self.current_index < len(self.comparison_results) - 1:
-            separator = QFrame()
-            separator.setFrameShape(QFrame.HLine)
-            separator.setFrameShadow(QFrame.Plain)
-            separator.setStyleSheet("background-color: #932CC3;") ##932CC3
-            separator.setMinimumHeight(4)
-            comparison_layout.addWidget(separator)
-
-        self.layout.addWidget(comparison_widget)
-
-        # Instead of addStretch() here, use QSpacerItem to avoid excessive space
-        spacer = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        comparison_layout.addItem(spacer)
-    
     def update_delete_button_text(self):
-        # Count the checked checkboxes
-        marked_for_deletion = sum(checkbox.isChecked() for checkbox in self.checkboxes)
+        marked_for_deletion = self.model.marked_count()
         # Update the button text
         #self.delete_button.setText(f'Review Deletion ({marked_for_deletion})')
         self.delete_button.page().runJavaScript(f'updateButtonText({marked_for_deletion})')
@@ -613,7 +755,7 @@ class ComparisonWindow(QMainWindow):
         QTimer.singleShot(0, self.draw_deletion_dialog)
 
     def draw_deletion_dialog(self):
-        num_files = len([checkbox for checkbox in self.checkboxes if checkbox.isChecked()])
+        num_files = self.model.marked_count()
 
         if num_files == 0:
             error_dialog = ErrorDialog('Error', 'Whoops!\nSeems like you forgot to mark any files for deletion.')
@@ -628,7 +770,7 @@ class ComparisonWindow(QMainWindow):
             self.start_deletion(deletion_type)
 
     def start_deletion(self, deletion_type):
-        self.deletion_worker = DeletionWorker(self.checkboxes, deletion_type)
+        self.deletion_worker = DeletionWorker(self.model.marked_files(), deletion_type)
         self.deletion_worker.progress_update.connect(self.update_progress_bar)
         self.deletion_worker.deletion_complete.connect(self.on_deletion_complete)
         self.deletion_worker.start()
@@ -878,7 +1020,7 @@ class ErrorDialog(QDialog):
 
 
 class ComparisonWindowVideo(QMainWindow):
-    def __init__(self, comparison_results):
+    def __init__(self, groups):
         super().__init__()
 
         self.setWindowTitle('Review Video Duplicates')
@@ -930,69 +1072,13 @@ class ComparisonWindowVideo(QMainWindow):
 
         self.main_layout.addWidget(titles_widget)
 
-        # Scroll area for viewing duplicates
-        self.scroll_area = QScrollArea(self)
-        self.scroll_area.setWidgetResizable(True) ##932CC3
-        self.scroll_area.setStyleSheet("""
-            QScrollBar:vertical {
-                border: none;
-                background-color: #2d2d2d;  /* Dark background color */
-                width: 10px;  /* Adjust the width of the scrollbar */
-                margin: 0px 0px 0px 0px;
-            }
-
-            QScrollBar::handle:vertical {
-                background-color: #932CC3;  /* Lighter gray for the handle */
-                min-height: 30px;  /* Minimum height for the handle */
-                border-radius: 5px;  /* Rounded corners for the handle */
-            }
-
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                background: none;  /* Remove arrows (if you want) */
-                height: 0px;  /* Set height to 0 to hide arrows */
-            }
-
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;  /* Background for pages (if you want to remove) */
-            }
-            
-            QScrollArea {
-                border: 2px solid #932CC3;                           
-            }
-        """)
-
-        # Widget to hold all duplicate comparisons
-        self.container_widget = QWidget()
-        self.scroll_area.setWidget(self.container_widget)
-
-        # Layout to arrange the duplicate comparisons vertically
-        self.layout = QVBoxLayout(self.container_widget)
-
-        self.main_layout.addWidget(self.scroll_area)
-
-        # Progress bar for loading widgets
-        self.progress_bar_comp = QProgressBar(self)
-        self.progress_bar_comp.setValue(0)
-        self.progress_bar_comp.setTextVisible(True)  # Show text inside the progress bar
-        self.progress_bar_comp.setFormat("Loading Duplicates... %p%")  # Custom text format inside the progress bar
-        self.progress_bar_comp.setAlignment(Qt.AlignCenter)  # Align text to center
-
-        # Style the progress bar
-        self.progress_bar_comp.setStyleSheet("""
-            QProgressBar {
-                border: 2px solid grey;
-                border-radius: 5px;
-                text-align: center;  /* Align text to center */
-                background-color: white;
-                color: black;  /* Text color inside the progress bar */
-            }
-            QProgressBar::chunk {
-                background-color: #AA39A9;  /* Change the progress color */
-                width: 20px;
-            }
-        """)
-        self.main_layout.addWidget(self.progress_bar_comp)
-
+        # Only the rows on screen are painted, so opening the window takes the same time for any number of duplicates
+        self.thumbnails = ThumbnailLoader(self.default_pixmap.scaled(370, 500, Qt.KeepAspectRatio), parent=self)
+        self.list_view = create_comparison_list(groups, self.describe_video, self.video_preview, self.prefetch_videos)
+        self.thumbnails.thumbnail_ready.connect(self.list_view.viewport().update)
+        self.model = self.list_view.model()
+        self.model.marked_changed.connect(self.update_delete_button_text)
+        self.main_layout.addWidget(self.list_view)
 
         # Progress bar for deleting
         self.delete_progress_bar = QProgressBar(self)
@@ -1018,11 +1104,6 @@ class ComparisonWindowVideo(QMainWindow):
         """)
         self.main_layout.addWidget(self.delete_progress_bar)
 
-        # Store references to checkboxes and associated paths
-        self.checkboxes = {}
-        self.comparison_results = comparison_results
-        self.current_index = 0
-
         # Delete button, initially hidden
         #self.delete_button = QPushButton('Review Deletion', self)
         #self.delete_button.clicked.connect(self.show_deletion_dialog)
@@ -1049,7 +1130,6 @@ class ComparisonWindowVideo(QMainWindow):
         self.delete_button = QWebEngineView(self)
         self.delete_button.setFixedSize(300,55)
         self.delete_button.setUrl(QUrl.fromLocalFile(resource_path('resources/review_button/button.html')))
-        self.delete_button.hide()
 
         self.delete_channel = QWebChannel(self.delete_button.page())
         self.bridge = Bridge(self)
@@ -1063,189 +1143,42 @@ class ComparisonWindowVideo(QMainWindow):
 
         self.main_layout.addLayout(button_layout)
 
-        # Initialize the batch size
-        self.batch_size = 8  # Number of items to load per batch
-        # Timer for incremental loading
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.load_next_batch)
-        self.timer.start(10)  # Adjust the interval as needed
+        # Show the delete button once its page had a moment to load
+        QTimer.singleShot(100, self.update_delete_button_text)
 
         central_widget = QWidget()
         central_widget.setLayout(self.main_layout)
         self.setCentralWidget(central_widget)
 
-    def load_next_batch(self):
-        """Load the next batch of comparison widgets."""
-        for _ in range(self.batch_size):
-            if self.current_index >= len(self.comparison_results):
-                self.timer.stop()
-                # Hide progress bar and show delete button when done
-                self.progress_bar_comp.hide()
-                self.delete_button.show()
-                # Add a slight delay before updating the button text
-                QTimer.singleShot(100, self.update_delete_button_text)
-                return
-
-            to_keep, to_delete = self.comparison_results[self.current_index]
-            self.create_comparison_widget(to_keep, to_delete)
-            self.current_index += 1
-
-            # Update progress bar
-            self.progress_bar_comp.setValue(int((self.current_index / len(self.comparison_results)) * 100))
-
-    def create_comparison_widget(self, to_keep, to_delete):
-        """Create and add widgets based on the provided data."""
-        to_keep_path, to_keep_name, to_keep_runtime, to_keep_resolution, to_keep_preview, to_keep_folder = to_keep
-        to_delete_path, to_delete_name, to_delete_runtime, to_delete_resolution, to_delete_preview, to_delete_folder = to_delete
-
-        # Truncate names if too long
-        to_keep_name = truncate_name(to_keep_name)
-        to_delete_name = truncate_name(to_delete_name)
-
-        comparison_widget = QWidget()
-        comparison_layout = QVBoxLayout(comparison_widget)
-        comparison_layout.setSpacing(0)
-
-        to_keep_resolution_str = f"{to_keep_resolution[0]}x{to_keep_resolution[1]}"
-        to_delete_resolution_str = f"{to_delete_resolution[0]}x{to_delete_resolution[1]}"
-
-        # Horizontal layout for filenames and resolutions
-        filenames_widget = QWidget()
-        filenames_layout = QHBoxLayout(filenames_widget)
-        filenames_layout.setSpacing(10)
-
-        to_keep_name_label = QLabel(f"NAME: {to_keep_name}\nDURATION: {to_keep_runtime}\nRESOLUTION: {to_keep_resolution_str}\nLOCATION: {to_keep_folder}")
-        to_keep_name_label.setAlignment(Qt.AlignLeft)
-        to_keep_name_label.setFont(QFont('Segoe UI', 10))
-        to_keep_name_label.setStyleSheet("color: green; font-weight: bold;")
-
-        to_delete_name_label = QLabel(f"NAME: {to_delete_name}\nDURATION: {to_delete_runtime}\nRESOLUTION: {to_delete_resolution_str}\nLOCATION: {to_delete_folder}")
-        to_delete_name_label.setAlignment(Qt.AlignRight)
-        to_delete_name_label.setFont(QFont('Segoe UI', 10))
-        to_delete_name_label.setStyleSheet("color: red; font-weight: bold;")
-
-        filenames_layout.addWidget(to_keep_name_label)
-        filenames_layout.addStretch()
-        filenames_layout.addWidget(to_delete_name_label)
-
-        comparison_layout.addWidget(filenames_widget)
-
-        # Horizontal layout for images
-        images_widget = QWidget()
-        images_layout = QHBoxLayout(images_widget)
-        images_layout.setSpacing(10)
-
-        to_keep_label = QLabel()
-        to_keep_pixmap = QPixmap(to_keep_preview)
-        if to_keep_pixmap.isNull():
-            to_keep_pixmap = self.default_pixmap.scaled(370,500,Qt.KeepAspectRatio)
-        to_keep_label.setPixmap(to_keep_pixmap.scaled(370, 500, Qt.KeepAspectRatio))
-
-        to_delete_label = QLabel()
-        to_delete_pixmap = QPixmap(to_delete_preview)
-        if to_delete_pixmap.isNull():
-            to_delete_pixmap = self.default_pixmap.scaled(370,500,Qt.KeepAspectRatio)
-        to_delete_label.setPixmap(to_delete_pixmap.scaled(370, 500, Qt.KeepAspectRatio))
-
-        images_layout.addStretch()
-        images_layout.addWidget(to_keep_label)
-        images_layout.addStretch()
-        images_layout.addWidget(to_delete_label)
-        images_layout.addStretch()
-
-        comparison_layout.addWidget(images_widget)
-
-        # Add space above checkbox
-        space_above_checkbox = QSpacerItem(20, 20, QSizePolicy.Minimum, QSizePolicy.Fixed)
-        comparison_layout.addItem(space_above_checkbox)
-
-        # Add a checkbox below the images to decide deletion
-        checkbox_layout = QHBoxLayout()
-        checkbox_layout.addStretch()
-
-        delete_checkbox = QCheckBox("Mark For Deletion")
-        delete_checkbox.setStyleSheet('color: white;')
-        delete_checkbox.setFont(QFont('Segoe UI', 14))
-        delete_checkbox.setChecked(True)
-        delete_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: white;
-                font-size: 14pt; /* Font size */
-            }
-            QCheckBox::indicator {
-                width: 18px; /* Width of the checkbox */
-                height: 18px; /* Height of the checkbox */
-            }
-            QCheckBox::indicator:checked {
-                background-color: #932CC3; /* Custom color for checked state */
-                border: 2px solid white; /* Border color and size */
-            }
-            QCheckBox::indicator:unchecked {
-                background-color: #333333; /* Custom color for unchecked state */
-                border: 2px solid white; /* Border color and size */
-            }
-        """)
+    def describe_video(self, video):
+        width, height = video.dimensions
+        return (f"NAME: {truncate_name(os.path.basename(video.path))}\nDURATION: {format_runtime(video.duration)}\nRESOLUTION: {width}x{height}"
+                f"\nSIZE: {format_file_size(video.file_size)}\nLOCATION: {os.path.basename(os.path.dirname(video.path))}")
 
-        # Connect state change signal to update function
-        delete_checkbox.stateChanged.connect(self.update_delete_button_text)
+    def video_preview(self, video):
+        # Previews are decoded on the thumbnail threads, the row is painted again once its preview arrives
+        pixmap = self.thumbnails.get(video.path)
+        if pixmap is None:
+            self.thumbnails.request(video.path, lambda path=video.path, preview=video.preview: load_video_thumbnail(path, preview))
+        return pixmap
 
-        checkbox_layout.addWidget(delete_checkbox)
+    def prefetch_videos(self, videos):
+        self.thumbnails.set_wanted(video.path for video in videos)
+        for video in videos:
+            self.thumbnails.request(video.path, lambda path=video.path, preview=video.preview: load_video_thumbnail(path, preview))
 
-        checkbox_layout.addStretch()
-        comparison_layout.addLayout(checkbox_layout)
-
-        self.checkboxes[delete_checkbox] = (to_keep_path, to_delete_path)
-
-        # Add space between the images and the separator
-        space_above_separator = QSpacerItem(20, 30, QSizePolicy.Minimum, QSizePolicy.Fixed)
-        comparison_layout.addItem(space_above_separator)
-
-        # Separator
-        if self.current_index < len(self.comparison_results) - 1:
-            separator = QFrame()
-            separator.setFrameShape(QFrame.HLine)
-            separator.setFrameShadow(QFrame.Plain)
-            separator.setStyleSheet("background-color: #932CC3;") ##932CC3
-            separator.setMinimumHeight(4)
-            comparison_layout.addWidget(separator)
-
-        self.layout.addWidget(comparison_widget)
-
-        # Instead of addStretch() here, use QSpacerItem to avoid excessive space
-        spacer = QSpacerItem(20, 40, QSizePolicy.Minimum, QSizePolicy.Expanding)
-        comparison_layout.addItem(spacer)
-    
     def update_delete_button_text(self):
-        # Count the checked checkboxes
-        marked_for_deletion = sum(checkbox.isChecked() for checkbox in self.checkboxes)
+        marked_for_deletion = self.model.marked_count()
         # Update the button text
         #self.delete_button.setText(f'Review Deletion ({marked_for_deletion})')
         self.delete_button.page().runJavaScript(f'updateButtonText({marked_for_deletion})')
 
-    def get_video_frame_preview(self, video_path):
-        """
-        Extract a frame from the middle of the video to use as a preview.
-        """
-        frame_count = get_frame_count(video_path)
-        middle_frame = frame_count // 2
-        cap = VideoCapture(video_path)
-        cap.set(CAP_PROP_POS_FRAMES, middle_frame)
-        ret, frame = cap.read()
-        cap.release()
-
-        if ret:
-            frame_rgb = cvtColor(frame, COLOR_BGR2RGB)
-            return convert_frame_to_pixmap(frame_rgb)
-        else:
-            return QPixmap()  # Return empty pixmap if failed
-
-
     def show_deletion_dialog(self):
         # Defer the deletion dialog display
         QTimer.singleShot(0, self.draw_deletion_dialog)
 
     def draw_deletion_dialog(self):
-        num_files = len([checkbox for checkbox in self.checkboxes if checkbox.isChecked()])
+        num_files = self.model.marked_count()
 
         if num_files == 0:
             error_dialog = ErrorDialog('Error', 'Whoops!\nSeems like you forgot to mark any files for deletion.')
@@ -1260,7 +1193,7 @@ class ComparisonWindowVideo(QMainWindow):
             self.start_deletion(deletion_type)
 
     def start_deletion(self, deletion_type):
-        self.deletion_worker = DeletionWorker(self.checkboxes, deletion_type)
+        self.deletion_worker = DeletionWorker(self.model.marked_files(), deletion_type)
         self.deletion_worker.progress_update.connect(self.update_progress_bar)
         self.deletion_worker.deletion_complete.connect(self.on_deletion_complete)
         self.deletion_worker.start()
@@ -1276,7 +1209,7 @@ class ComparisonWindowVideo(QMainWindow):
 
 class DuplicateFinderWorker(QThread):
     progress_update = pyqtSignal(int)  # Signal to update progress bar
-    comparison_complete = pyqtSignal(list)  # Signal to emit the comparison results
+    comparison_complete = pyqtSignal(list)  # Signal to emit the duplicate groups
 
     def __init__(self, folder_path, search_type):
         super().__init__()
@@ -1286,139 +1219,54 @@ class DuplicateFinderWorker(QThread):
     def run(self):
         # Find duplicates
         if self.search_type == 'photo':
-            duplicates = find_duplicates(self.folder_path, self.update_finding_progress)
+            groups = find_duplicates(self.folder_path, self.update_finding_progress)
         elif self.search_type == 'video':
-            duplicates = find_video_duplicates(self.folder_path, self.update_finding_progress)
+            # Previews are read later by the review window, only for the videos that have duplicates
+            groups = find_video_duplicates(self.folder_path, self.update_finding_progress, previews=False)
+        elif self.search_type == 'media':
+            groups = find_media_duplicates(self.folder_path, self.update_finding_progress, video_options={'previews': False})
         else:
-            duplicates = []
+            groups = []
 
-        # If duplicates found, perform comparisons
-        if duplicates:
-            comparison_results = self.compare_duplicates(duplicates)
-            self.comparison_complete.emit(comparison_results)
-        else:
-            self.comparison_complete.emit([])
+        # The groups already say which file to keep and carry everything the review windows show,
+        # so they go to the windows as they are
+        if groups and self.search_type == 'media':
+            # Images and videos are reviewed in separate windows
+            image_groups = [group for group in groups if not isinstance(group.keeper, VideoRecord)]
+            video_groups = [group for group in groups if isinstance(group.keeper, VideoRecord)]
+            groups = [image_groups, video_groups]
+        self.comparison_complete.emit(groups)
 
     def update_progress(self, progress):
         self.progress_update.emit(progress)
 
     def update_finding_progress(self, progress):
-        # Adjust progress to fit within the first 50% range
-        adjusted_progress = int(progress * 0.5)  # Mapping to 0-50 range
-        self.update_progress(adjusted_progress)
-
-    def update_comparing_progress(self, progress):
-        # Adjust progress to fit within the remaining 50% range
-        adjusted_progress = 50 + int(progress * 0.5)  # Mapping to 50-100 range
-        self.update_progress(adjusted_progress)
-
-    def compare_duplicates(self, duplicates):
-        comparison_results = []
-        total_comparisons = len(duplicates)
-        
-        # Choose the comparison method based on the search type
-        if self.search_type == 'photo':
-            for index, (img1_path, img2_path, img1_hash, img2_hash) in enumerate(duplicates):
-                comparison_result = self.compare_two_images(img1_path, img2_path, img1_hash, img2_hash)
-                comparison_results.append(comparison_result)
-                self.update_comparing_progress(int((index + 1) / total_comparisons * 100))
-                # Yield to the event loop
-                QThread.msleep(1)  # Short sleep to allow UI updates
-                QApplication.processEvents()  # Process UI events to keep UI responsive
-        elif self.search_type == 'video':
-            for index, (vid1_path, vid2_path) in enumerate(duplicates):
-                comparison_result = self.compare_two_videos(vid1_path, vid2_path)
-                comparison_results.append(comparison_result)
-                self.update_comparing_progress(int((index + 1) / total_comparisons * 100))
-                # Yield to the event loop
-                QThread.msleep(1)  # Short sleep to allow UI updates
-                QApplication.processEvents()  # Process UI events to keep UI responsive
-        
-        return comparison_results
-
-    def compare_two_images(self, img1_path, img2_path, img1_hash, img2_hash):
-        img1_name = os.path.basename(img1_path)
-        img2_name = os.path.basename(img2_path)
-        img1_resolution = get_image_resolution(img1_path)[1]
-        img2_resolution = get_image_resolution(img2_path)[1]
-        img1_folder = os.path.basename(os.path.dirname(img1_path))
-        img2_folder = os.path.basename(os.path.dirname(img2_path))
-        print(f'IN COMPARE FUNCTION: Comparing {img1_name} AND {img2_name}')
-
-        if img1_resolution > img2_resolution:
-            to_keep = (img1_path, img1_name, img1_resolution, img1_folder, img1_hash)
-            to_delete = (img2_path, img2_name, img2_resolution, img2_folder, img2_hash)
-        elif img1_resolution < img2_resolution:
-            to_keep = (img2_path, img2_name, img2_resolution, img2_folder, img2_hash)
-            to_delete = (img1_path, img1_name, img1_resolution, img1_folder, img1_hash)
-        else:
-            if len(img1_name) < len(img2_name) or (len(img1_name) == len(img2_name) and img1_name < img2_name):
-                to_keep = (img1_path, img1_name, img1_resolution, img1_folder, img1_hash)
-                to_delete = (img2_path, img2_name, img2_resolution, img2_folder, img2_hash)
-            else:
-                to_keep = (img2_path, img2_name, img2_resolution, img2_folder, img2_hash)
-                to_delete = (img1_path, img1_name, img1_resolution, img1_folder, img1_hash)
-
-        return (to_keep, to_delete)
-    
-    def compare_two_videos(self, vid1_path, vid2_path):
-        vid1_name = os.path.basename(vid1_path)
-        vid2_name = os.path.basename(vid2_path)
-        vid1_resolution = get_video_resolution(vid1_path)
-        vid2_resolution = get_video_resolution(vid2_path)
-        print(f'paths: {vid1_path} 2: {vid2_path}')
-        vid1_runtime = get_video_runtime(vid1_path)
-        vid2_runtime = get_video_runtime(vid2_path)
-        vid1_folder = os.path.basename(os.path.dirname(vid1_path))
-        vid2_folder = os.path.basename(os.path.dirname(vid2_path))
-
-        print(f'IN COMPARE FUNCTION: Comparing {vid1_name} AND {vid2_name}')
-
-        # Compare based on resolution and then on runtime
-        if vid1_resolution[0] * vid1_resolution[1] > vid2_resolution[0] * vid2_resolution[1]:
-            to_keep = (vid1_path, vid1_name, vid1_runtime, vid1_resolution, self.get_video_frame_preview(vid1_path), vid1_folder)
-            to_delete = (vid2_path, vid2_name, vid2_runtime, vid2_resolution, self.get_video_frame_preview(vid2_path), vid2_folder)
-        elif vid1_resolution[0] * vid1_resolution[1] < vid2_resolution[0] * vid2_resolution[1]:
-            to_keep = (vid2_path, vid2_name, vid2_runtime, vid2_resolution, self.get_video_frame_preview(vid2_path), vid2_folder)
-            to_delete = (vid1_path, vid1_name, vid1_runtime, vid1_resolution, self.get_video_frame_preview(vid1_path), vid1_folder)
-        else:
-            # If resolutions are equal, use name length and alphabetical order
-            if len(vid1_name) < len(vid2_name) or (len(vid1_name) == len(vid2_name) and vid1_name < vid2_name):
-                to_keep = (vid1_path, vid1_name, vid1_runtime, vid1_resolution, self.get_video_frame_preview(vid1_path), vid1_folder)
-                to_delete = (vid2_path, vid2_name, vid2_runtime, vid2_resolution, self.get_video_frame_preview(vid2_path), vid2_folder)
-            else:
-                to_keep = (vid2_path, vid2_name, vid2_runtime, vid2_resolution, self.get_video_frame_preview(vid2_path), vid2_folder)
-                to_delete = (vid1_path, vid1_name, vid1_runtime, vid1_resolution, self.get_video_frame_preview(vid1_path), vid1_folder)
+        self.update_progress(progress)
 
-        return (to_keep, to_delete)
 
-    def get_video_frame_preview(self, video_path):
-        """
-        Extract a frame from the middle of the video to use as a preview.
-        """
-        frame_count = get_frame_count(video_path)
-        middle_frame = frame_count // 2
-        cap = VideoCapture(video_path)
-        cap.set(CAP_PROP_POS_FRAMES, middle_frame)
-        ret, frame = cap.read()
-        cap.release()
-
-        if ret:
-            frame_rgb = cvtColor(frame, COLOR_BGR2RGB)
-            return convert_frame_to_pixmap(frame_rgb)
-        else:
-            return QPixmap()  # Return empty pixmap if failed
-        
-def shred_file(file_path, passes=1):
+SHRED_CHUNK_SIZE = 1024 * 1024  # Bytes overwritten per write while shredding
+
+def shred_file(file_path, passes=1, progress_callback=None):
     """
     Shred a file by overwriting it with random data for a specified number of passes.
+    The file is overwritten one chunk of os.urandom data at a time, so memory use does not depend on the file size,
+    and every pass is flushed to disk before the next one starts. progress_callback(byte_count) is called with
+    the number of bytes written after every chunk.
     """
     try:
         with open(file_path, "r+b") as f:
-            length = os.path.getsize(file_path)
+            length = os.fstat(f.fileno()).st_size
             for _ in range(passes):
                 f.seek(0)
-                f.write(bytearray(getrandbits(8) for _ in range(length)))
+                remaining = length
+                while remaining:
+                    chunk_size = min(remaining, SHRED_CHUNK_SIZE)
+                    f.write(os.urandom(chunk_size))
+                    remaining -= chunk_size
+                    if progress_callback:
+                        progress_callback(chunk_size)
+                f.flush()
+                os.fsync(f.fileno())
         os.remove(file_path)
         print(f"File shredded: {file_path}")
     except Exception as e:
@@ -1428,31 +1276,60 @@ class DeletionWorker(QThread):
     progress_update = pyqtSignal(int)
     deletion_complete = pyqtSignal()
 
-    def __init__(self, checkboxes, deletion_type):
+    def __init__(self, marked_files, deletion_type):
         super().__init__()
-        self.checkboxes = checkboxes
+        self.marked_files = marked_files  # (to_keep_path, to_delete_path) of every duplicate marked for deletion
         self.deletion_type = deletion_type
 
+    def shred_passes(self):
+        if "Shred" not in self.deletion_type:
+            return 0
+        if "1 Pass" in self.deletion_type:
+            return 1
+        if "7 Passes" in self.deletion_type:
+            return 7
+        if "15 Passes" in self.deletion_type:
+            return 15
+        return 0
+
     def run(self):
-        total_files = len([checkbox for checkbox in self.checkboxes if checkbox.isChecked()])
+        total_files = len(self.marked_files)
         deleted_count = 0
+        passes = self.shred_passes()
 
-        for checkbox, (to_keep_path, to_delete_path) in self.checkboxes.items():
-            if checkbox.isChecked():
+        # Shredding reports progress in bytes written, so one large video does not hold the bar still
+        total_bytes = 0
+        if passes:
+            for to_keep_path, to_delete_path in self.marked_files:
                 try:
-                    if self.deletion_type == "Normal Deletion":
-                        os.remove(to_delete_path)
-                    elif "Shred" in self.deletion_type:
-                        if "1 Pass" in self.deletion_type:
-                            shred_file(to_delete_path, passes=1)
-                        elif "7 Passes" in self.deletion_type:
-                            shred_file(to_delete_path, passes=7)
-                        elif "15 Passes" in self.deletion_type:
-                            shred_file(to_delete_path, passes=15)
-                except Exception as e:
-                    print(f"Error deleting file {to_delete_path}: {e}")
-                deleted_count += 1
-                self.progress_update.emit(int((deleted_count / total_files) * 100))
+                    total_bytes += os.path.getsize(to_delete_path) * passes
+                except OSError:
+                    pass
+        progress = {'bytes': 0, 'percent': -1}
+
+        def update_progress():
+            if total_bytes:
+                percent = int(progress['bytes'] / total_bytes * 100)
+            else:
+                percent = int((deleted_count / total_files) * 100)
+            if percent != progress['percent']:
+                progress['percent'] = percent
+                self.progress_update.emit(percent)
+
+        def add_shredded_bytes(byte_count):
+            progress['bytes'] += byte_count
+            update_progress()
+
+        for to_keep_path, to_delete_path in self.marked_files:
+            try:
+                if self.deletion_type == "Normal Deletion":
+                    os.remove(to_delete_path)
+                elif passes:
+                    shred_file(to_delete_path, passes=passes, progress_callback=add_shredded_bytes)
+            except Exception as e:
+                print(f"Error deleting file {to_delete_path}: {e}")
+            deleted_count += 1
+            update_progress()
 
         self.deletion_complete.emit()
         
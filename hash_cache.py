@@ -0,0 +1,190 @@
+"""
+Persistent on-disk cache of media hashes.
+
+Entries are keyed by file path and only trusted while the file's size, mtime
+and inode are unchanged, so re-scans can skip decoding files that have not
+been touched since the previous run.
+"""
+
+import json
+import os
+import sqlite3
+import numpy
+import logging_wrapper
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media_hashes (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    hash INTEGER,
+    signature BLOB,
+    width INTEGER,
+    height INTEGER,
+    metadata TEXT,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS media_hashes_last_used ON media_hashes (last_used);
+"""
+
+
+def file_key(file_path, stat_result=None):
+    """
+    Build the (size, mtime_ns, inode) key that decides whether a cache entry is still valid.
+    """
+    if stat_result is None:
+        stat_result = os.stat(file_path)
+    return stat_result.st_size, stat_result.st_mtime_ns, stat_result.st_ino
+
+
+def _to_signed(hash_value):
+    # SQLite integers are signed 64-bit, so store the upper half of the range as negatives
+    return hash_value - (1 << 64) if hash_value >= (1 << 63) else hash_value
+
+
+def _to_unsigned(hash_value):
+    return hash_value + (1 << 64) if hash_value < 0 else hash_value
+
+
+class HashCache:
+    """
+    SQLite backed hash cache with invalidation, compaction and LRU eviction.
+    max_entries limits the number of stored files; the least recently used ones are evicted first.
+    """
+
+    def __init__(self, cache_path, max_entries=None):
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+
+        cache_dir = os.path.dirname(os.path.abspath(cache_path))
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+        self.connection = sqlite3.connect(cache_path)
+        self.connection.executescript(_SCHEMA)
+
+        # Every opening of the cache is one "generation", used as the LRU clock
+        (last_generation,) = self.connection.execute("SELECT COALESCE(MAX(last_used), 0) FROM media_hashes").fetchone()
+        self.generation = last_generation + 1
+        self.used_paths = []  # Cache hits whose last_used still needs to be bumped
+        logging_wrapper.log_info(f'Opened hash cache with {len(self)} entries.')
+
+    def get(self, file_path, key, kind, params):
+        """
+        Look up a file. Returns (hash, signature, dimensions, metadata), or None if the
+        file is not cached, has changed since it was cached, or was hashed with other params.
+        """
+        row = self.connection.execute(
+            "SELECT size, mtime_ns, inode, kind, params, hash, signature, width, height, metadata FROM media_hashes WHERE path = ?",
+            (file_path,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        size, mtime_ns, inode, cached_kind, cached_params, hash_value, signature, width, height, metadata = row
+        if (size, mtime_ns, inode) != tuple(key) or cached_kind != kind or cached_params != params:
+            return None
+
+        self.used_paths.append(file_path)
+        if hash_value is not None:
+            hash_value = _to_unsigned(hash_value)
+        if signature is not None:
+            signature = numpy.frombuffer(signature, dtype=numpy.uint64).copy()
+        if metadata is not None:
+            metadata = json.loads(metadata)
+        return hash_value, signature, (width, height), metadata
+
+    def put(self, file_path, key, kind, params, hash_value=None, signature=None, dimensions=(None, None), metadata=None):
+        """
+        Store (or replace) the hashes and metadata of a file.
+        """
+        size, mtime_ns, inode = key
+        self.connection.execute(
+            "INSERT OR REPLACE INTO media_hashes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                file_path, size, mtime_ns, inode, kind, params,
+                None if hash_value is None else _to_signed(int(hash_value)),
+                None if signature is None else numpy.asarray(signature, dtype=numpy.uint64).tobytes(),
+                dimensions[0], dimensions[1],
+                None if metadata is None else json.dumps(metadata),
+                self.generation,
+            )
+        )
+
+    def invalidate(self, file_paths):
+        """
+        Remove specific files from the cache.
+        """
+        self.connection.executemany("DELETE FROM media_hashes WHERE path = ?", ((path,) for path in file_paths))
+        self.connection.commit()
+
+    def clear(self):
+        """
+        Remove every entry from the cache.
+        """
+        self.connection.execute("DELETE FROM media_hashes")
+        self.connection.commit()
+
+    def evict(self):
+        """
+        Drop the least recently used entries until the cache fits within max_entries.
+        """
+        if self.max_entries is None:
+            return 0
+        excess = len(self) - self.max_entries
+        if excess <= 0:
+            return 0
+        self.connection.execute(
+            "DELETE FROM media_hashes WHERE path IN (SELECT path FROM media_hashes ORDER BY last_used LIMIT ?)",
+            (excess,)
+        )
+        self.connection.commit()
+        logging_wrapper.log_info(f'Evicted {excess} entries from the hash cache.')
+        return excess
+
+    def compact(self):
+        """
+        Remove entries for files that were deleted or changed, then shrink the database file.
+        """
+        stale_paths = []
+        for file_path, size, mtime_ns, inode in self.connection.execute("SELECT path, size, mtime_ns, inode FROM media_hashes"):
+            try:
+                if file_key(file_path) != (size, mtime_ns, inode):
+                    stale_paths.append(file_path)
+            except OSError:
+                stale_paths.append(file_path)
+
+        self.invalidate(stale_paths)
+        self.connection.execute("VACUUM")
+        logging_wrapper.log_info(f'Compacted hash cache, removed {len(stale_paths)} stale entries.')
+        return len(stale_paths)
+
+    def commit(self):
+        """
+        Write pending entries and LRU updates to disk, and evict if the cache grew too large.
+        """
+        if self.used_paths:
+            self.connection.executemany(
+                "UPDATE media_hashes SET last_used = ? WHERE path = ?",
+                ((self.generation, path) for path in self.used_paths)
+            )
+            self.used_paths = []
+        self.connection.commit()
+        self.evict()
+
+    def close(self):
+        self.commit()
+        self.connection.close()
+
+    def __len__(self):
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM media_hashes").fetchone()
+        return count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
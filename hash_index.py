@@ -0,0 +1,183 @@
+"""
+Near-neighbour indexes for 64-bit perceptual hashes.
+
+Both indexes answer the same question: "which stored hashes are within
+`threshold` bits (Hamming distance) of this hash?". They let the duplicate
+finder avoid comparing every file against every other file.
+"""
+
+from array import array
+import numpy
+
+HASH_BITS = 64
+
+# Popcount lookup table for NumPy versions without bitwise_count
+_BYTE_POPCOUNT = numpy.array([bin(value).count('1') for value in range(256)], dtype=numpy.uint8)
+
+
+def image_hash_to_int(image_hash):
+    """
+    Pack an imagehash.ImageHash into a single 64-bit integer (same bit order as its hex string).
+    """
+    return int.from_bytes(numpy.packbits(image_hash.hash.flatten()).tobytes(), 'big')
+
+
+def hash_to_hex(hash_value):
+    """
+    Format an integer hash as the 16 character hex string imagehash would show.
+    """
+    return f"{hash_value:016x}"
+
+
+def hamming_distance(hash1, hash2):
+    """
+    Calculate the Hamming distance between two integer hashes (popcount of the XOR).
+    """
+    return (hash1 ^ hash2).bit_count()
+
+
+def hamming_distances(hashes1, hashes2):
+    """
+    Vectorized Hamming distance over uint64 arrays.
+    Pass a single hash and an array for one-vs-many, or two equally long arrays for element-wise distances.
+    """
+    xor = numpy.bitwise_xor(numpy.asarray(hashes1, dtype=numpy.uint64), numpy.asarray(hashes2, dtype=numpy.uint64))
+    if hasattr(numpy, 'bitwise_count'):
+        return numpy.bitwise_count(xor)
+    # Older NumPy: count the bits of every byte and sum them per hash
+    xor = numpy.ascontiguousarray(xor)
+    return _BYTE_POPCOUNT[xor.view(numpy.uint8)].reshape(xor.shape + (8,)).sum(axis=-1)
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree keyed by Hamming distance.
+    Works for any threshold, and is the better choice when the threshold is large.
+    """
+
+    def __init__(self):
+        # Each node is [hash, items, children], where children maps distance -> node
+        self.root = None
+        self.size = 0
+
+    def add(self, hash_value, item):
+        """
+        Add an item to the tree under the given hash.
+        """
+        self.size += 1
+        if self.root is None:
+            self.root = [hash_value, [item], {}]
+            return
+
+        node = self.root
+        while True:
+            distance = hamming_distance(hash_value, node[0])
+            if distance == 0:
+                node[1].append(item)  # Identical hash, keep it in the same node
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [hash_value, [item], {}]
+                return
+            node = child
+
+    def query(self, hash_value, threshold):
+        """
+        Return a list of (item, distance) for every stored hash within the threshold.
+        """
+        matches = []
+        if self.root is None:
+            return matches
+
+        nodes_to_visit = [self.root]
+        while nodes_to_visit:
+            node = nodes_to_visit.pop()
+            distance = hamming_distance(hash_value, node[0])
+            if distance <= threshold:
+                matches.extend((item, distance) for item in node[1])
+
+            # Triangle inequality: only children in [distance - threshold, distance + threshold] can match
+            low, high = distance - threshold, distance + threshold
+            for child_distance, child in node[2].items():
+                if low <= child_distance <= high:
+                    nodes_to_visit.append(child)
+        return matches
+
+    def __len__(self):
+        return self.size
+
+
+class MultiIndexHashIndex:
+    """
+    Pigeonhole multi-index over chunks of the hash.
+    The hash is split into threshold + 1 chunks; two hashes within the threshold
+    must share at least one chunk exactly, so only those buckets are checked.
+    """
+
+    def __init__(self, threshold, hash_bits=HASH_BITS):
+        self.threshold = threshold
+        self.hash_bits = hash_bits
+        chunk_count = min(threshold + 1, hash_bits)
+
+        # Spread the bits as evenly as possible over the chunks
+        self.chunks = []  # List of (shift, mask)
+        start = 0
+        for chunk_index in range(chunk_count):
+            width = hash_bits // chunk_count + (1 if chunk_index < hash_bits % chunk_count else 0)
+            self.chunks.append((start, (1 << width) - 1))
+            start += width
+
+        self.tables = [{} for _ in self.chunks]
+        self.hashes = array('Q')  # Compact uint64 storage
+        self.items = []
+
+    def add(self, hash_value, item):
+        """
+        Add an item to the index under the given hash.
+        """
+        position = len(self.hashes)
+        self.hashes.append(hash_value)
+        self.items.append(item)
+        for table, (shift, mask) in zip(self.tables, self.chunks):
+            table.setdefault((hash_value >> shift) & mask, []).append(position)
+
+    def query(self, hash_value, threshold=None):
+        """
+        Return a list of (item, distance) for every stored hash within the threshold.
+        The threshold can not be larger than the one the index was built for.
+        """
+        if threshold is None:
+            threshold = self.threshold
+        if threshold > self.threshold:
+            raise ValueError(f"Index was built for threshold {self.threshold}, got {threshold}.")
+
+        seen = set()
+        matches = []
+        for table, (shift, mask) in zip(self.tables, self.chunks):
+            for position in table.get((hash_value >> shift) & mask, ()):
+                if position in seen:
+                    continue
+                seen.add(position)
+                distance = hamming_distance(hash_value, self.hashes[position])
+                if distance <= threshold:
+                    matches.append((self.items[position], distance))
+        return matches
+
+    def __len__(self):
+        return len(self.hashes)
+
+
+def create_hash_index(threshold, index_type='auto'):
+    """
+    Create an empty hash index suited for the given threshold.
+    'auto' picks the multi-index for small thresholds (chunks of at least 8 bits) and the BK-tree otherwise.
+    """
+    if index_type == 'auto':
+        index_type = 'multi' if threshold < HASH_BITS // 8 else 'bktree'
+
+    if index_type == 'multi':
+        return MultiIndexHashIndex(threshold)
+    elif index_type == 'bktree':
+        return BKTree()
+    else:
+        raise ValueError(f"Unknown index type: {index_type}")
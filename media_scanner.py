@@ -0,0 +1,158 @@
+"""
+Shared media file enumerator.
+
+Walks one or more folders with os.scandir and classifies every file by its
+extension in the same pass, so a scan for images and videos only walks the
+tree once. The stat results come from the directory listing where the
+platform provides them, folders and files can be filtered with glob patterns
+and a maximum depth, and the walk can be spread over several threads for
+high-latency network filesystems.
+"""
+
+import fnmatch
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import logging_wrapper
+
+# A file found by the scanner. kind is the media type its extension belongs to (e.g. 'image'), stat its os.stat result.
+MediaFile = namedtuple('MediaFile', ['path', 'kind', 'stat'])
+
+
+def physical_file_id(stat_result):
+    """
+    Identify the file on disk behind a path as (st_dev, st_ino), so hardlinks and the same folder reached
+    through a bind mount or symlink can be recognised. Returns None where the platform reports no inode number.
+    """
+    if not stat_result.st_ino:
+        return None
+    return stat_result.st_dev, stat_result.st_ino
+
+
+def _root_folders(folder_path):
+    """
+    Normalize folder_path (a folder or a list of folders) to the folders that need to be walked.
+    A folder given twice, or inside another requested folder, is already covered by the outer walk.
+    """
+    folder_paths = [folder_path] if isinstance(folder_path, str) else folder_path
+    absolute_paths = {}
+    for folder in folder_paths:
+        absolute_paths.setdefault(os.path.join(os.path.abspath(folder), ''), folder)
+    return [
+        folder for absolute_path, folder in absolute_paths.items()
+        if not any(absolute_path.startswith(other) and absolute_path != other for other in absolute_paths)
+    ]
+
+
+def _matches(relative_path, name, patterns):
+    # Patterns match the path relative to the scanned folder (with / separators) or just the name
+    return any(fnmatch.fnmatch(relative_path, pattern) or fnmatch.fnmatch(name, pattern) for pattern in patterns)
+
+
+def _stat_entry(entry):
+    """
+    Stat a DirEntry. On Windows this comes for free with the listing, but without an inode number,
+    which is then read with os.stat so aliases can still be recognised.
+    """
+    stat_result = entry.stat()
+    if not stat_result.st_ino:
+        stat_result = os.stat(entry.path)
+    return stat_result
+
+
+def _list_folder(folder, relative_folder, depth, extension_kinds, include, exclude, max_depth):
+    """
+    List one folder. Returns the MediaFiles in it and the (path, relative path, depth, stat) of its subfolders.
+    """
+    media_files = []
+    subfolders = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                name = entry.name
+                relative_path = f"{relative_folder}/{name}" if relative_folder else name
+                if exclude and _matches(relative_path, name, exclude):
+                    continue
+                try:
+                    # Symlinked folders are not followed (like os.walk), symlinked files are
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is None or depth < max_depth:
+                            subfolders.append((entry.path, relative_path, depth + 1, _stat_entry(entry)))
+                        continue
+
+                    # Classify by extension first, that needs no system call
+                    dot = name.rfind('.')
+                    kind = extension_kinds.get(name[dot:].lower()) if dot > 0 else None
+                    if kind is None or (include and not _matches(relative_path, name, include)) or not entry.is_file():
+                        continue
+                    media_files.append(MediaFile(entry.path, kind, _stat_entry(entry)))
+                except OSError as e:
+                    print(f"Skipping {entry.path}: {e}")
+    except OSError as e:
+        print(f"Could not read folder {folder}: {e}")
+    return media_files, subfolders
+
+
+def scan_media(folder_path, kinds, include=None, exclude=None, max_depth=None, threads=1, alias_callback=None):
+    """
+    Lazily walk a folder (or list of folders), including subfolders, and yield a MediaFile for every file
+    with one of the extensions in kinds, a dict of kind -> extensions (e.g. {'image': IMAGE_EXTENSIONS}).
+    include and exclude are lists of glob patterns; excluded folders are not entered, and when include is
+    given only files matching it are yielded. max_depth limits how deep subfolders are walked (0 is only the
+    folder itself). With threads > 1 several folders are listed at the same time, in no particular order.
+    A folder that was already walked under another path (bind mount, symlinked root) is skipped,
+    and alias_callback(walked_path, alias_path) is called for it.
+    """
+    extension_kinds = {extension.lower(): kind for kind, extensions in kinds.items() for extension in extensions}
+    walked_folders = {}  # (st_dev, st_ino) -> path the folder was walked as
+    scan_state = {'folders': 0, 'aliases': 0}
+
+    def first_visit(folder, stat_result):
+        folder_id = physical_file_id(stat_result) if stat_result is not None else None
+        if folder_id is not None:
+            walked_folder = walked_folders.setdefault(folder_id, folder)
+            if walked_folder != folder:
+                scan_state['aliases'] += 1
+                if alias_callback:
+                    alias_callback(walked_folder, folder)
+                return False
+        scan_state['folders'] += 1
+        return True
+
+    roots = []
+    for root in _root_folders(folder_path):
+        try:
+            root_stat = os.stat(root)
+        except OSError as e:
+            print(f"Could not read folder {root}: {e}")
+            continue
+        if first_visit(root, root_stat):
+            roots.append((root, '', 0))
+
+    def list_folder(folder, relative_folder, depth):
+        return _list_folder(folder, relative_folder, depth, extension_kinds, include, exclude, max_depth)
+
+    if threads <= 1:
+        # Depth first, files of a folder before its subfolders, like os.walk
+        folders_to_visit = list(reversed(roots))
+        while folders_to_visit:
+            media_files, subfolders = list_folder(*folders_to_visit.pop())
+            yield from media_files
+            subfolders = [
+                (subfolder, relative_path, depth) for subfolder, relative_path, depth, stat_result in subfolders
+                if first_visit(subfolder, stat_result)
+            ]
+            folders_to_visit.extend(reversed(subfolders))
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            pending = {pool.submit(list_folder, *root) for root in roots}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    media_files, subfolders = future.result()
+                    for subfolder, relative_path, depth, stat_result in subfolders:
+                        if first_visit(subfolder, stat_result):
+                            pending.add(pool.submit(list_folder, subfolder, relative_path, depth))
+                    yield from media_files
+
+    logging_wrapper.log_info(f"Walked {scan_state['folders']} folders, skipped {scan_state['aliases']} already walked under another path.")